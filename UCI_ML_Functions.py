@@ -1,4 +1,34 @@
 # Functions to read, analyze, and download from UCI ML portal
+import contextlib
+import threading
+
+# File extensions of raw data files which can be parsed into a DataFrame
+DATA_EXTENSIONS = (".data", ".csv", ".dat", ".txt", ".tsv", ".test", ".train")
+
+# File extensions which are already compressed and hence never re-compressed on download
+ALREADY_COMPRESSED = (".zip", ".gz", ".tgz", ".Z", ".bz2", ".xz", ".zst", ".7z", ".rar")
+
+# File extensions of archives which can be extracted after (or while) downloading
+TAR_EXTENSIONS = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz")
+ARCHIVE_EXTENSIONS = TAR_EXTENSIONS + (".zip", ".Z")
+
+# Name of the manifest (JSON file) listing the files extracted from each archive
+EXTRACTION_MANIFEST = "extracted_files.json"
+MANIFEST_LOCK = threading.Lock()
+
+# Name of the metadata (JSON file) recording the size and validators of the files of a synced dataset
+SYNC_MANIFEST = "sync_metadata.json"
+
+# Columns of the catalog records (one per dataset) built by crawling the portal
+CATALOG_COLUMNS = ["Dataset", "Name", "Abstract", "Identifier string", "Datapage URL"]
+
+# Time to live (in seconds) of the user-level catalog cache, and its state in this process
+CATALOG_CACHE_TTL = 7 * 24 * 3600
+CATALOG_CACHE = {}
+CATALOG_LOCKS = {}
+CATALOG_REFRESHING = set()
+CATALOG_REFRESHED = {}
+CATALOG_LOCK = threading.Lock()
 
 # ==========================================
 # Function to read UCI ML datasets table
@@ -203,21 +233,20 @@ def build_dataset_list(url="https://archive.ics.uci.edu/ml/datasets", msg_flag=T
 
 
 # ======================================================================================
-# Function to create dictionary of datasets' name, description, and identifier string
+# Generator yielding the name, description and identifier of every dataset
 # ======================================================================================
-def build_dataset_dictionary(
+def iter_dataset_dictionary(
     url="https://archive.ics.uci.edu/ml/datasets.html?format=&task=&att=&area=&numAtt=&numIns=&type=&sort=nameUp&view=list",
     msg_flag=True,
 ):
     """
-    Scrapes through the UCI ML datasets page and builds a dictionary of all datasets with names and description.
-    Also stores the unique identifier corresponding to the dataset.
-    This identifier string is needed by the downloader function to download the data file. Generic name won't work.
+    Generator scraping the UCI ML datasets page and yielding a (name, description, identifier) tuple per dataset as soon as it is parsed.
+    The identifier string is needed by the downloader function to download the data file. Generic name won't work.
+    Raises an exception if the page could not be read.
     """
     import urllib.request, urllib.parse, urllib.error
     from bs4 import BeautifulSoup
     import ssl
-    import time
     import re
 
     # Ignore SSL certificate errors
@@ -225,26 +254,16 @@ def build_dataset_dictionary(
     ctx.check_hostname = False
     ctx.verify_mode = ssl.CERT_NONE
 
-    url = url
     if msg_flag:
         print("Opening the file connection...")
-    try:
-        uh = urllib.request.urlopen(url, context=ctx)
-        html = uh.read()
-    except:
-        print("Could not open the UCI ML portal successfully. Sorry!")
-        return -1
+    uh = urllib.request.urlopen(url, context=ctx)
+    html = uh.read()
 
     soup = BeautifulSoup(html, "html5lib")
 
-    lst = []
-    for tag in soup.find_all("p"):
-        lst.append(tag.contents)
-
     i = 0
-    description_dict = {}
-
-    for l in lst:
+    for tag in soup.find_all("p"):
+        l = tag.contents
         if len(l) > 2:
             if str(l[1]).find("datasets/") != -1:
                 string = str(l[1])
@@ -252,98 +271,732 @@ def build_dataset_dictionary(
                 x, y = s.span()
                 name = string[x + 2 : y - 4]
                 desc = l[2][2:]
-                tmp_list = []
-                description_dict[name] = tmp_list
-                description_dict[name].append(desc)
                 s = re.search('".*"', string)
                 x, y = s.span()
                 identifier = string[x + 10 : y - 1]
-                description_dict[name].append(identifier)
                 i += 1
-        if msg_flag:
-            if i % 10 == 0 and i != 0:
-                print(f"Record {i} processed!")
+                if msg_flag and i % 10 == 0:
+                    print(f"Record {i} processed!")
+                yield name, desc, identifier
+
+
+# ======================================================================================
+# Function to build a dictionary of all datasets with names and description
+# ======================================================================================
+def build_dataset_dictionary(
+    url="https://archive.ics.uci.edu/ml/datasets.html?format=&task=&att=&area=&numAtt=&numIns=&type=&sort=nameUp&view=list",
+    msg_flag=True,
+):
+    """
+    Scrapes through the UCI ML datasets page and builds a dictionary of all datasets with names and description.
+    Also stores the unique identifier corresponding to the dataset.
+    This identifier string is needed by the downloader function to download the data file. Generic name won't work.
+    Collects the tuples yielded by iter_dataset_dictionary.
+    """
+    description_dict = {}
+    try:
+        for name, desc, identifier in iter_dataset_dictionary(url, msg_flag=msg_flag):
+            if name not in description_dict:
+                description_dict[name] = [desc, identifier]
+    except Exception:
+        print("Could not open the UCI ML portal successfully. Sorry!")
+        return -1
 
     return description_dict
 
 
 # ===============================================================
-# Function to create a DataFrame with all information together
+# Function to read the records saved in a crawl checkpoint file
+# ===============================================================
+def read_crawl_checkpoint(checkpoint):
+    """
+    Reads the records saved so far in a crawl checkpoint (JSON-lines file, one dataset per line) written by build_full_dataframe.
+    A truncated last line (e.g. after a crash) is ignored. Returns a dictionary of dataset name to record.
+    """
+    import json
+    import os
+
+    records = {}
+    if not os.path.exists(checkpoint):
+        return records
+
+    with open(checkpoint, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            records[record["Dataset"]] = record
+
+    return records
+
+
+# ===============================================================
+# Function to open a crawl checkpoint file for appending records
+# ===============================================================
+def open_crawl_checkpoint(checkpoint):
+    """
+    Opens a crawl checkpoint (JSON-lines file) for appending records, terminating a line left truncated by an earlier crash.
+    """
+    import os
+
+    f = open(checkpoint, "a", encoding="utf-8")
+    if f.tell() > 0:
+        with open(checkpoint, "rb") as fr:
+            fr.seek(-1, os.SEEK_END)
+            if fr.read(1) != b"\n":
+                f.write("\n")
+
+    return f
+
+
+# ===============================================================
+# Function to append a record to a crawl checkpoint file
+# ===============================================================
+def write_crawl_checkpoint(f, record):
+    """
+    Appends a record to an open crawl checkpoint, and makes sure it reached the disk.
+    """
+    import json
+    import os
+
+    f.write(json.dumps(record) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+# ===============================================================
+# Generator crawling the catalog record by record
+# ===============================================================
+def iter_dataset_records(msg_flag=False, checkpoint=None):
+    """
+    Generator crawling the UCI ML portal and yielding one catalog record per dataset (a dictionary with the keys
+    'Dataset', 'Name', 'Abstract', 'Identifier string' and 'Datapage URL') as soon as its page is fetched and parsed.
+    Consumers can stop early (e.g. at the first matching dataset) or start downloading while the crawl goes on.
+    checkpoint: Optional name of a checkpoint file (JSON-lines). Every record is appended to it as soon as it is fetched,
+    and records already in it are yielded without fetching their page again. Pages which failed with a transient
+    (e.g. network) error are yielded as 'URL not available' but not checkpointed, so a resumed crawl retries them.
+    Raises an exception if the datasets page could not be read.
+    """
+    records = {}
+    f = None
+    if checkpoint != None:
+        records = read_crawl_checkpoint(checkpoint)
+        if msg_flag and len(records) > 0:
+            print(f"Resuming the crawl: {len(records)} datasets already processed.")
+        f = open_crawl_checkpoint(checkpoint)
+
+    try:
+        seen = set()
+        for name, desc, identifier in iter_dataset_dictionary(msg_flag=False):
+            if name in seen:
+                continue
+            seen.add(name)
+            if name in records:
+                yield records[name]
+                continue
+            try:
+                a = extract_url_dataset(
+                    identifier, msg_flag=msg_flag, raise_errors=True
+                )
+                definitive = True
+            except Exception:
+                # Not checkpointed, so that a resumed crawl fetches the page again
+                a = None
+                definitive = False
+            if a == None:
+                a = "URL not available"
+            record = dict(zip(CATALOG_COLUMNS, [name, name, desc, identifier, a]))
+            if f != None and definitive:
+                write_crawl_checkpoint(f, record)
+            if msg_flag:
+                print(f"Dataset processed:{name}")
+            yield record
+    finally:
+        if f != None:
+            f.close()
+
+
+# ===============================================================
+# Asynchronous generator crawling the catalog concurrently
 # ===============================================================
-def build_full_dataframe(msg_flag=False):
+async def aiter_dataset_records(msg_flag=False, checkpoint=None, max_concurrency=8):
+    """
+    Asynchronous variant of iter_dataset_records, to be used with 'async for'.
+    Up to 'max_concurrency' dataset pages are fetched at the same time (in worker threads), and the records are yielded
+    in the order their pages arrive, so the event loop can search, filter or download while the crawl goes on.
+    checkpoint: Optional name of a checkpoint file (JSON-lines), as for iter_dataset_records.
+    Raises an exception if the datasets page could not be read.
+    """
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    records = {}
+    f = None
+    if checkpoint != None:
+        records = read_crawl_checkpoint(checkpoint)
+        if msg_flag and len(records) > 0:
+            print(f"Resuming the crawl: {len(records)} datasets already processed.")
+        f = open_crawl_checkpoint(checkpoint)
+
+    pending = {}
+    try:
+        entries = await loop.run_in_executor(
+            executor, lambda: list(iter_dataset_dictionary(msg_flag=False))
+        )
+        entries = iter(entries)
+        seen = set()
+        while True:
+            # Keep up to 'max_concurrency' pages in flight
+            for name, desc, identifier in entries:
+                if name in seen:
+                    continue
+                seen.add(name)
+                if name in records:
+                    yield records[name]
+                    continue
+                future = loop.run_in_executor(
+                    executor, extract_url_dataset, identifier, msg_flag, True
+                )
+                pending[future] = (name, desc, identifier)
+                if len(pending) >= max_concurrency:
+                    break
+            if len(pending) == 0:
+                break
+            done, running = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for future in done:
+                name, desc, identifier = pending.pop(future)
+                definitive = future.exception() == None
+                a = future.result() if definitive else None
+                if a == None:
+                    a = "URL not available"
+                record = dict(zip(CATALOG_COLUMNS, [name, name, desc, identifier, a]))
+                if f != None and definitive:
+                    write_crawl_checkpoint(f, record)
+                if msg_flag:
+                    print(f"Dataset processed:{name}")
+                yield record
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+        if f != None:
+            f.close()
+
+
+# ===============================================================
+# Function to build a DataFrame of all the datasets information
+# ===============================================================
+def build_full_dataframe(msg_flag=False, checkpoint=None):
     """
     Builds a DataFrame with all information together including the url link for downloading the data.
+    Collects the records yielded by iter_dataset_records.
+    checkpoint: Optional name of a checkpoint file (JSON-lines). Every dataset is appended to it as soon as it is processed,
+    and datasets already in it are skipped, so a crawl which failed half-way can be restarted without losing the work done.
     """
     import pandas as pd
-    import urllib.request, urllib.parse, urllib.error
-    from bs4 import BeautifulSoup
-    import ssl
-    import time
 
-    # Ignore SSL certificate errors
-    ctx = ssl.create_default_context()
-    ctx.check_hostname = False
-    ctx.verify_mode = ssl.CERT_NONE
+    try:
+        records = list(iter_dataset_records(msg_flag=msg_flag, checkpoint=checkpoint))
+    except Exception:
+        print("Could not open the UCI ML portal successfully. Sorry!")
+        return None
+
+    df_dataset = pd.DataFrame.from_records(records, columns=CATALOG_COLUMNS)
+    df_dataset.set_index("Dataset", inplace=True)
 
-    i = 0
-    d = build_dataset_dictionary(msg_flag=False)
-    new_d = {}
-    dataset_list = build_dataset_list(msg_flag=False)
-
-    for k, v in d.items():
-        a = extract_url_dataset(v[1], msg_flag=msg_flag)
-        if a != None:
-            desc = v[0]
-            identifier = v[1]
-            v[0] = k
-            v[1] = desc
-            v.append(identifier)
-            v.append(a)
-            new_d[k] = v
-            i += 1
-            if msg_flag:
-                print(f"Dataset processed:{k}")
-        else:
-            desc = v[0]
-            identifier = v[1]
-            v[0] = k
-            v[1] = desc
-            v.append(identifier)
-            v.append("URL not available")
-            new_d[k] = v
-            if msg_flag:
-                print(f"Dataset processed:{k}")
     if msg_flag:
+        i = (df_dataset["Datapage URL"] != "URL not available").sum()
         print("\nTotal datasets analyzed: ", i)
 
-    df_dataset = pd.DataFrame(data=new_d)
-    df_dataset = df_dataset.T
-    df_dataset.columns = ["Name", "Abstract", "Identifier string", "Datapage URL"]
-    df_dataset.index.set_names(["Dataset"], inplace=True)
-
     return df_dataset
 
 
+# ======================================================================
+# Function listing the datasets of a crawl without a definitive record
+# ======================================================================
+def unresolved_datasets(df, checkpoint):
+    """
+    Returns the names of the datasets of a crawled catalog (built with the given checkpoint) which are not in the checkpoint,
+    i.e. whose page failed with a transient (e.g. network) error and which are listed as 'URL not available' only for now.
+    """
+    records = read_crawl_checkpoint(checkpoint)
+
+    return [name for name in df.index if name not in records]
+
+
 # ================================================================================================
 # Function to build a local database (CSV file) with name and URL (of raw data page) information
 # ================================================================================================
-def build_local_database(filename=None, msg_flag=True):
+def build_local_database(filename=None, msg_flag=True, resume=True):
     """
     Reads through the UCI ML portal and builds a local table with information such as: \
     name, size, ML task, data type
     filename: Optional filename that can be chosen by the user
+    resume: Default is True. The crawl is checkpointed to a file named after the database (with a '.checkpoint.jsonl' suffix),
+    so running the function again after a failure resumes the crawl. The checkpoint is removed once the database is written,
+    unless some pages could not be read (e.g. network errors): running the function again then only fetches those pages.
     """
-    df_local = build_full_dataframe(msg_flag=msg_flag)
+    import os
+
+    if filename == None:
+        filename = "UCI database.csv"
+    checkpoint = filename + ".checkpoint.jsonl" if resume else None
+
+    df_local = build_full_dataframe(msg_flag=msg_flag, checkpoint=checkpoint)
+    if df_local is None:
+        return None
     try:
-        if filename != None:
-            df_local.to_csv(filename)
-        else:
-            df_local.to_csv("UCI database.csv")
+        df_local.to_csv(filename)
     except:
         print(
             "Sorry, could not create the CSV table. Please make sure to close an already opened file, \
         or to have sufficient permission to write files in the current directory"
         )
+        return None
+
+    if checkpoint != None:
+        unresolved = unresolved_datasets(df_local, checkpoint)
+        if len(unresolved) > 0:
+            print(
+                f"Sorry, the pages of {len(unresolved)} datasets could not be read and are listed as 'URL not available'. "
+                f"The checkpoint {checkpoint} is kept: run build_local_database again to retry them."
+            )
+        elif os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+
+# ==================================================================
+# Function returning the directory of the user-level catalog cache
+# ==================================================================
+def catalog_cache_dir():
+    """
+    Returns the directory of the user-level catalog cache: $UCIML_CACHE_DIR if it is set,
+    otherwise a 'uciml' folder in the user cache directory ($XDG_CACHE_HOME or ~/.cache).
+    """
+    import os
+
+    if os.environ.get("UCIML_CACHE_DIR"):
+        return os.environ["UCIML_CACHE_DIR"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+
+    return os.path.join(base, "uciml")
+
+
+# ==================================================================
+# Function to read a catalog (database or table) from a cache file
+# ==================================================================
+def read_catalog_file(kind, filename):
+    """
+    Reads a cached catalog: the database (indexed by 'Dataset') or the raw table of datasets.
+    """
+    import pandas as pd
+
+    if kind == "database":
+        return pd.read_csv(filename, index_col="Dataset")
+    return pd.read_csv(filename, index_col=0)
+
+
+# ==================================================================
+# Function to fetch a catalog from the portal into a cache file
+# ==================================================================
+def fetch_catalog(kind, filename, msg_flag=False):
+    """
+    Fetches a catalog from the UCI ML portal: the database (crawled by build_full_dataframe, with a checkpoint next to the
+    cache file so an interrupted crawl resumes) or the raw table of datasets (read by read_dataset_table).
+    The cache file is written atomically. If some pages of the database could not be read (e.g. network errors),
+    the checkpoint is kept and the cache file is marked as stale, so that a later refresh fetches those pages again.
+    msg_flag: Controls verbosity
+    Returns the catalog as read back from the cache file, or None if it could not be fetched.
+    """
+    import os
+
+    checkpoint = filename + ".checkpoint.jsonl"
+    if kind == "database":
+        df = build_full_dataframe(msg_flag=False, checkpoint=checkpoint)
+    else:
+        try:
+            df = read_dataset_table(msg_flag=False)
+        except:
+            df = None
+    if df is None:
+        return None
+
+    with atomic_open(filename) as f:
+        f.write(df.to_csv().encode("utf-8"))
+    unresolved = unresolved_datasets(df, checkpoint) if kind == "database" else []
+    if len(unresolved) > 0:
+        os.utime(filename, (0, 0))
+        if msg_flag:
+            print(
+                f"The pages of {len(unresolved)} datasets could not be read and are listed as 'URL not available' for now. "
+                "They are fetched again at the next refresh of the catalog."
+            )
+    elif os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    return read_catalog_file(kind, filename)
+
+
+# ==================================================================
+# Function refreshing a stale catalog cache (in a background thread)
+# ==================================================================
+def refresh_catalog(kind, filename, ttl, msg_flag=False):
+    """
+    Fetches a catalog again, unless another process refreshed the cache file in the meantime.
+    Runs in a background thread started by cached_catalog. The callers keep using the stale copy until the new one is written.
+    """
+    import os
+    import time
+
+    try:
+        with file_lock(filename + ".lock"):
+            if time.time() - os.path.getmtime(filename) > ttl:
+                if fetch_catalog(kind, filename, msg_flag) is None and msg_flag:
+                    print(f"Sorry, could not refresh the cached catalog: {filename}")
+    except:
+        if msg_flag:
+            print(f"Sorry, could not refresh the cached catalog: {filename}")
+    finally:
+        with CATALOG_LOCK:
+            CATALOG_REFRESHING.discard(filename)
+
+
+# ==================================================================
+# Function returning the catalog from the user-level catalog cache
+# ==================================================================
+def cached_catalog(kind="database", ttl=None, cache_dir=None, msg_flag=True):
+    """
+    Returns a catalog of datasets from the user-level catalog cache, fetching it from the UCI ML portal only when needed.
+    This is what the user API functions use when no local database or table is supplied.
+    kind: 'database' (name, abstract and datapage URL of the datasets, as built by build_local_database)
+    or 'table' (the raw table of datasets, as read by read_dataset_table).
+    ttl: Time to live of the cache in seconds. By default CATALOG_CACHE_TTL (one week).
+    Within the TTL the cached copy is returned at once. After expiry the stale copy is still returned at once,
+    while a background thread fetches a fresh one (at most one refresh per hour).
+    Only a cold start (no cached copy yet) waits for the fetch, and only once: concurrent callers (threads,
+    or processes sharing the cache directory) wait for the same fetch instead of starting their own.
+    cache_dir: Optional cache directory. By default catalog_cache_dir() is used.
+    msg_flag: Controls verbosity
+    Returns a DataFrame, or None if there is no cached copy and the portal could not be read.
+    """
+    import os
+    import time
+
+    assert kind in ["database", "table"]
+    if ttl == None:
+        ttl = CATALOG_CACHE_TTL
+    if cache_dir == None:
+        cache_dir = catalog_cache_dir()
+    if kind == "database":
+        filename = os.path.join(cache_dir, "UCI database.csv")
+    else:
+        filename = os.path.join(cache_dir, "UCI datasets table.csv")
+
+    with CATALOG_LOCK:
+        lock = CATALOG_LOCKS.setdefault(filename, threading.Lock())
+
+    with lock:
+        entry = CATALOG_CACHE.get(filename)
+        # (Re)load the cache file if it is new, or was refreshed by a background thread or another process
+        if os.path.exists(filename):
+            mtime = os.path.getmtime(filename)
+            if entry == None or entry[1] != mtime:
+                entry = (read_catalog_file(kind, filename), mtime)
+                CATALOG_CACHE[filename] = entry
+
+        if entry == None:
+            if msg_flag:
+                print(
+                    f"Catalog not cached yet. Building the master {kind} from the website (only done once)..."
+                )
+            os.makedirs(cache_dir, exist_ok=True)
+            with file_lock(filename + ".lock"):
+                if os.path.exists(filename):
+                    df = read_catalog_file(kind, filename)
+                else:
+                    df = fetch_catalog(kind, filename, msg_flag)
+            if df is None:
+                print("Sorry, could not read the catalog from the UCI ML portal!")
+                return None
+            entry = (df, os.path.getmtime(filename))
+            CATALOG_CACHE[filename] = entry
+            if msg_flag:
+                print("Done!")
+
+        elif time.time() - entry[1] > ttl:
+            with CATALOG_LOCK:
+                last = CATALOG_REFRESHED.get(filename, 0)
+                start = filename not in CATALOG_REFRESHING and time.time() - last > 3600
+                if start:
+                    CATALOG_REFRESHING.add(filename)
+                    CATALOG_REFRESHED[filename] = time.time()
+            if start:
+                if msg_flag:
+                    print(
+                        f"The cached {kind} is stale, refreshing it in the background."
+                    )
+                threading.Thread(
+                    target=refresh_catalog,
+                    args=(kind, filename, ttl, msg_flag),
+                    daemon=True,
+                ).start()
+
+    return entry[0].copy()
+
+
+# ====================================================================
+# Compact in-memory representation of the catalog of datasets
+# ====================================================================
+class CompactCatalog:
+    """
+    Compact in-memory representation of a catalog DataFrame (the local database, the local table, or both merged).
+    Low-cardinality text columns are stored as categoricals and integer columns are downcast.
+    Other text columns hold interned strings, shared between columns and with the index (e.g. 'Dataset' and 'Name').
+    URLs are stored as a categorical prefix (e.g. the machine-learning-databases folder) plus a suffix,
+    and the 'Identifier string' only where it differs from the URL-quoted name.
+    column(col) rebuilds one column, to_dataframe() returns a DataFrame view with the original columns.
+    """
+
+    def __init__(self, df):
+        import urllib.parse
+        import numpy as np
+        import pandas as pd
+
+        self.columns = list(df.columns)
+        self.index_name = df.index.name
+        self.index_column = None
+        self.index = None
+        self.dtypes = {}
+        self.urls = {}
+        self.identifiers = None
+
+        frame = {}
+        for col in df.columns:
+            s = df[col]
+            is_text = pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s)
+            if col == "Identifier string" and "Name" in df.columns and is_text:
+                # Store only the identifiers which cannot be derived from the name
+                quoted = [urllib.parse.quote_plus(str(n)) for n in df["Name"]]
+                differs = s.to_numpy(dtype=object) != np.array(quoted, dtype=object)
+                self.identifiers = dict(
+                    zip(np.flatnonzero(differs).tolist(), s[differs].tolist())
+                )
+                self.dtypes[col] = s.dtype
+            elif str(col).endswith("URL") and is_text:
+                prefixes = []
+                suffixes = []
+                for url in s.tolist():
+                    if isinstance(url, str) and "/" in url.rstrip("/"):
+                        i = url.rstrip("/").rfind("/") + 1
+                        prefixes.append(url[:i])
+                        suffixes.append(url[i:])
+                    else:
+                        prefixes.append("")
+                        suffixes.append(url)
+                self.urls[col] = (
+                    pd.Categorical(prefixes),
+                    self.compact_strings(suffixes, s.dtype),
+                )
+                self.dtypes[col] = s.dtype
+            elif pd.api.types.is_integer_dtype(s):
+                frame[col] = pd.to_numeric(s, downcast="integer").to_numpy()
+            elif is_text and s.nunique() <= 0.5 * len(s):
+                frame[col] = pd.Categorical(s)
+            elif is_text:
+                frame[col] = self.compact_strings(s.tolist(), s.dtype)
+            else:
+                frame[col] = s.to_numpy()
+        self.frame = pd.DataFrame(frame)
+
+        # The index is usually a copy of one of the text columns (e.g. 'Dataset' and 'Name')
+        for col in self.frame.columns:
+            if isinstance(self.frame[col].dtype, pd.CategoricalDtype):
+                continue
+            if df.index.equals(pd.Index(df[col])):
+                self.index_column = col
+                break
+        if self.index_column == None and not isinstance(df.index, pd.RangeIndex):
+            values = df.index
+            if pd.api.types.is_object_dtype(values):
+                values = self.compact_strings(values.tolist(), values.dtype)
+            self.index = pd.Index(values, name=self.index_name)
+
+    @staticmethod
+    def compact_strings(values, dtype):
+        """
+        Returns an array of the given strings. Object arrays hold interned strings, so equal strings are shared.
+        """
+        import sys
+        import numpy as np
+        import pandas as pd
+
+        if pd.api.types.is_object_dtype(dtype):
+            return np.array(
+                [sys.intern(v) if isinstance(v, str) else v for v in values],
+                dtype=object,
+            )
+        return pd.array(values, dtype=dtype)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def column(self, col):
+        """
+        Returns one column of the catalog as a Series (rebuilt if it is stored split or derived).
+        """
+        import urllib.parse
+        import pandas as pd
+
+        if col in self.urls:
+            prefixes, suffixes = self.urls[col]
+            values = [
+                p + v if isinstance(v, str) else v for p, v in zip(prefixes, suffixes)
+            ]
+            s = pd.Series(values, dtype=self.dtypes[col])
+        elif col == "Identifier string" and self.identifiers != None:
+            values = [urllib.parse.quote_plus(str(n)) for n in self.column("Name")]
+            for i, v in self.identifiers.items():
+                values[i] = v
+            s = pd.Series(values, dtype=self.dtypes[col])
+        else:
+            s = self.frame[col].copy(deep=False)
+        s.name = col
+        s.index = self.frame.index
+        return s
+
+    def to_dataframe(self):
+        """
+        Returns a DataFrame view of the catalog, with the original columns and index.
+        Low-cardinality columns stay categoricals (which compare equal to plain strings).
+        """
+        import pandas as pd
+
+        df = pd.DataFrame(
+            {col: self.column(col) for col in self.columns}, columns=self.columns
+        )
+        if self.index_column != None:
+            df.index = pd.Index(self.frame[self.index_column], name=self.index_name)
+        elif self.index is not None:
+            df.index = self.index
+
+        return df
+
+    def memory_usage(self):
+        """
+        Returns the number of bytes held by the catalog, including the strings it references.
+        """
+        return catalog_memory_usage(self)
+
+
+# ====================================================================
+# Function to measure the memory held by a catalog
+# ====================================================================
+def catalog_memory_usage(catalog):
+    """
+    Returns the number of bytes held by a catalog (a DataFrame or a CompactCatalog), including the strings it references.
+    Unlike DataFrame.memory_usage(deep=True), a string shared by several cells (or by a column and the index) is counted once.
+    """
+    import sys
+    import numpy as np
+    import pandas as pd
+
+    seen = set()
+
+    def objects_size(values):
+        size = 0
+        for v in values:
+            if id(v) not in seen:
+                seen.add(id(v))
+                size += sys.getsizeof(v)
+        return size
+
+    def array_size(values):
+        if isinstance(values, (pd.Series, pd.Index)):
+            if pd.api.types.is_extension_array_dtype(values.dtype):
+                values = values.array
+            else:
+                values = values.to_numpy()
+        if isinstance(values, pd.Categorical):
+            return values.codes.nbytes + array_size(values.categories)
+        if isinstance(values, np.ndarray):
+            if values.dtype == object:
+                return values.nbytes + objects_size(values)
+            return values.nbytes
+        # Other extension arrays (e.g. Arrow backed strings) hold no Python objects
+        return pd.Series(values).memory_usage(deep=True, index=False)
+
+    if isinstance(catalog, CompactCatalog):
+        size = sum(array_size(catalog.frame[col]) for col in catalog.frame.columns)
+        for prefixes, suffixes in catalog.urls.values():
+            size += array_size(prefixes) + array_size(suffixes)
+        if catalog.identifiers != None:
+            size += sys.getsizeof(catalog.identifiers)
+            size += objects_size(catalog.identifiers.keys())
+            size += objects_size(catalog.identifiers.values())
+        if catalog.index is not None:
+            size += array_size(catalog.index)
+        return size
+
+    size = sum(array_size(catalog[col]) for col in catalog.columns)
+    if isinstance(catalog.index, pd.RangeIndex):
+        size += catalog.index.memory_usage()
+    else:
+        size += array_size(catalog.index)
+
+    return size
+
+
+# ====================================================================
+# Function comparing the memory used by plain and compact catalogs
+# ====================================================================
+def catalog_memory_benchmark(
+    local_database="UCI database.csv", local_table="UCI table.csv", msg_flag=True
+):
+    """
+    Loads the local database and table, and compares the memory they use as plain DataFrames and as CompactCatalog objects.
+    Returns the comparison as a DataFrame.
+    local_database: Name of the database (CSV file) stored locally i.e. in the same directory, which contains information about all the datasets on UCI ML repo.
+    local_table: Name of the table (CSV file) stored locally, which contains features information about all the datasets on UCI ML repo.
+    msg_flag: Controls verbosity
+    """
+    import pandas as pd
+
+    catalogs = {}
+    if local_database != None:
+        catalogs["database"] = pd.read_csv(local_database, index_col="Dataset")
+    if local_table != None:
+        catalogs["table"] = pd.read_csv(local_table, index_col=0)
+    if "database" in catalogs and "table" in catalogs:
+        catalogs["merged"] = catalogs["table"].merge(catalogs["database"], on="Name")
+
+    results = []
+    for name, df in catalogs.items():
+        compact = CompactCatalog(df)
+        plain_bytes = catalog_memory_usage(df)
+        compact_bytes = compact.memory_usage()
+        results.append(
+            {
+                "Catalog": name,
+                "Rows": len(df),
+                "DataFrame (pandas deep)": int(df.memory_usage(deep=True).sum()),
+                "DataFrame": plain_bytes,
+                "CompactCatalog": compact_bytes,
+                "Ratio": round(compact_bytes / plain_bytes, 3),
+            }
+        )
+    df_results = pd.DataFrame(results)
+
+    if msg_flag:
+        print(df_results.to_string(index=False))
+
+    return df_results
 
 
 # ===============================================================================
@@ -363,13 +1016,9 @@ def return_abstract(name, local_database=None, msg_flag=False):
         df = pd.read_csv(local_database, index_col="Dataset")
     else:
         local_df_flag = False
-        if msg_flag:
-            print(
-                "Local database not supplied.\nBuilding the master database by crawling the website..."
-            )
-        df = build_full_dataframe(msg_flag=False)
-        if msg_flag:
-            print("Done!")
+        df = cached_catalog("database", msg_flag=msg_flag)
+        if df is None:
+            return None
 
     # Number of rows
     nrows = df.shape[0]
@@ -431,11 +1080,14 @@ def print_all_datasets_names(msg_flag=False):
 # ==========================================
 # Function for extracting dataset page url
 # ==========================================
-def extract_url_dataset(dataset, msg_flag=False):
+def extract_url_dataset(dataset, msg_flag=False, raise_errors=False):
     """
     Given a dataset identifier this function extracts the URL for the page where the actual raw data resides.
+    raise_errors: Default is False. If set to True, transient errors (network errors, server errors) are raised instead of returning None,
+    so that a crawl can tell them from datasets which really have no data page.
     """
     import urllib.request, urllib.parse, urllib.error
+    import http.client
     from bs4 import BeautifulSoup
     import ssl
     import time
@@ -469,100 +1121,1308 @@ def extract_url_dataset(dataset, msg_flag=False):
 
             # After finishing the for-loop with a-tags, the first dataurl is added to the dictionary
             # dataset_dict['dataurl']=dataurls[0]
+    except urllib.error.HTTPError as e:
+        if raise_errors and (e.code >= 500 or e.code == 429):
+            raise
+        return None
+    except (OSError, http.client.HTTPException):
+        if raise_errors:
+            raise
+        return None
     except:
         # print("Could not retrieve")
         return None
 
 
-# ================================
-# File download helper function
-# ================================
-def download_file(url, directory):
+# ================================================================
+# Helper function to open a (possibly compressed) local data file
+# ================================================================
+def open_compressed_file(filename, mode="rb", fileobj=None):
     """
-    Downloads a file from a given url into the given directory.
+    Opens a local file for binary reading or writing, transparently (de)compressing it based on its extension.
+    Files ending with '.gz' are handled with gzip, files ending with '.zst' with zstd (needs the 'zstandard' package).
+    Any other file is opened as a plain binary file.
+    mode: Either 'rb' (default) or 'wb'.
+    fileobj: Optional binary file object to read from or write to, instead of opening 'filename' (which then only selects the format).
+    It is left open when the returned file is closed.
+    """
+    import gzip
+
+    assert mode in ["rb", "wb"]
+
+    if filename.endswith(".gz"):
+        if fileobj != None:
+            return gzip.GzipFile(mode=mode, fileobj=fileobj)
+        return gzip.open(filename, mode)
+    elif filename.endswith(".zst"):
+        import zstandard
+
+        f = open(filename, mode) if fileobj == None else fileobj
+        if mode == "wb":
+            return zstandard.ZstdCompressor().stream_writer(f, closefd=fileobj == None)
+        else:
+            return zstandard.ZstdDecompressor().stream_reader(
+                f, closefd=fileobj == None
+            )
+    else:
+        return open(filename, mode) if fileobj == None else fileobj
+
+
+# ==========================================================================
+# Helper function to write a file atomically (temporary file, then rename)
+# ==========================================================================
+@contextlib.contextmanager
+def atomic_open(filename):
+    """
+    Context manager opening a temporary file (in the same directory) for binary writing, which replaces 'filename' only once it is completely written.
+    Readers, and other processes writing the same file, never see a partially written file. On error, the temporary file is removed.
+    The file gets the mode of the file it replaces, or the usual mode of new files (0666 minus the umask), not the private mode of temporary files.
     """
-    import requests
     import os
+    import uuid
 
-    local_filename = directory + "/" + url.split("/")[-1]
-    # NOTE the stream=True parameter
-    r = requests.get(url, stream=True)
+    directory = os.path.dirname(filename) or "."
+    while True:
+        tmp_filename = os.path.join(
+            directory,
+            "." + os.path.basename(filename) + "." + uuid.uuid4().hex[:8] + ".part",
+        )
+        try:
+            # Unlike tempfile.mkstemp (mode 0600), this lets the kernel apply the umask to the usual mode 0666
+            flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0)
+            fd = os.open(tmp_filename, flags, 0o666)
+            break
+        except FileExistsError:
+            continue
+    f = os.fdopen(fd, "wb")
     try:
-        with open(local_filename, "wb") as f:
-            for chunk in r.iter_content(chunk_size=1024):
-                if chunk:  # filter out keep-alive new chunks
-                    f.write(chunk)
+        yield f
+        f.close()
+        try:
+            os.chmod(tmp_filename, os.stat(filename).st_mode & 0o7777)
+        except OSError:
+            # No file to replace: keep the mode of a new file
+            pass
+        os.replace(tmp_filename, filename)
     except:
-        print("Sorry could not write this particular file!")
-        # f.flush()
+        f.close()
+        os.remove(tmp_filename)
+        raise
 
 
-# =====================================================
-# Function for downloading the data set from a page
-# =====================================================
-def download_dataset_url(url, directory, msg_flag=False, download_flag=True):
+# ===========================================================
+# Helper function to hold an exclusive lock across processes
+# ===========================================================
+@contextlib.contextmanager
+def file_lock(filename):
     """
-    Download all the files from the links in the given url.
-    msg_flag: Controls verbosity.
-    download_flag: Default is True. If set to False, only creates the directories but does not initiate download (for testing purpose).
+    Context manager holding an exclusive lock on the given (lock) file, which is created if needed.
+    Other processes (and threads) locking the same file wait until the lock is released.
     """
-
-    import urllib.request, urllib.parse, urllib.error
-    from bs4 import BeautifulSoup
-    import ssl
     import os
 
-    if url == "URL not available":
-        return None
+    f = open(filename, "a+b")
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        yield
+    finally:
+        if os.name == "nt":
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        f.close()
 
-    cwd = os.getcwd()
+
+# ======================================================
+# Storage backend writing files into a local directory
+# ======================================================
+class LocalStorage:
+    """
+    Storage backend for downloaded files on the local filesystem.
+    Keys are relative paths with '/' separators (e.g. 'Iris/iris.data'), stored under the 'root' directory.
+    root: Optional root directory. If None, keys are used as paths as they are (relative to the current directory, or absolute).
+    Files are written atomically and parent directories are created as needed.
+    """
+
+    def __init__(self, root=None):
+        self.root = root
+
+    def path(self, key):
+        """
+        Returns the local path of a key.
+        """
+        import os
+
+        if self.root == None:
+            return key
+        return os.path.join(self.root, *key.split("/"))
+
+    def open_write(self, key):
+        """
+        Context manager giving a binary file to write the contents of a key.
+        """
+        import os
+
+        path = self.path(key)
+        if os.path.dirname(path) != "":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        return atomic_open(path)
+
+    def open_read(self, key):
+        """
+        Opens a key for binary reading.
+        """
+        return open(self.path(key), "rb")
+
+    def exists(self, key):
+        import os
+
+        return os.path.isfile(self.path(key))
+
+    def delete(self, key):
+        import os
+
+        os.remove(self.path(key))
+
+    def list_keys(self, prefix=""):
+        """
+        Lists the keys stored below the given prefix (a directory).
+        """
+        import os
+
+        base = self.root or "."
+        start = self.path(prefix) if prefix else base
+        keys = []
+        for dirpath, dirs, files in os.walk(start):
+            dirs[:] = [d for d in dirs if d != ".uciml_locks"]
+            for f in files:
+                relative = os.path.relpath(os.path.join(dirpath, f), base)
+                keys.append(relative.replace(os.sep, "/"))
+
+        return sorted(keys)
+
+    def lock(self, key):
+        """
+        Context manager holding an exclusive lock on a key, across threads and processes (and nodes sharing the
+        filesystem, if it supports file locks). The lock file is kept in a hidden '.uciml_locks' folder next to the key,
+        which list_keys skips.
+        """
+        import os
+
+        path = self.path(key)
+        lock_directory = os.path.join(os.path.dirname(path), ".uciml_locks")
+        os.makedirs(lock_directory, exist_ok=True)
+
+        return file_lock(os.path.join(lock_directory, os.path.basename(path) + ".lock"))
+
+
+# ==========================================================================
+# Writer streaming bytes into an S3 multipart upload with bounded memory
+# ==========================================================================
+class S3MultipartWriter:
+    """
+    Write-only file-like object uploading the bytes written to it as an S3 multipart upload, one part at a time.
+    At most 'part_size' bytes are held in memory. Small files (below one part) are uploaded with a single request.
+    Use it as a context manager: the upload is completed on exit, or aborted if an exception was raised.
+    """
+
+    def __init__(self, client, bucket, key, part_size=8 * 1024 * 1024):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self.buffer = bytearray()
+        self.upload_id = None
+        self.parts = []
+        self.closed = False
+
+    def write(self, data):
+        self.buffer += data
+        while len(self.buffer) >= self.part_size:
+            self.upload_part(bytes(self.buffer[: self.part_size]))
+            del self.buffer[: self.part_size]
+        return len(data)
+
+    def upload_part(self, data):
+        if self.upload_id == None:
+            response = self.client.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key
+            )
+            self.upload_id = response["UploadId"]
+        number = len(self.parts) + 1
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=number,
+            Body=data,
+        )
+        self.parts.append({"ETag": response["ETag"], "PartNumber": number})
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.upload_id == None:
+            self.client.put_object(
+                Bucket=self.bucket, Key=self.key, Body=bytes(self.buffer)
+            )
+        else:
+            if len(self.buffer) > 0:
+                self.upload_part(bytes(self.buffer))
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self.upload_id,
+                MultipartUpload={"Parts": self.parts},
+            )
+        self.buffer = bytearray()
+
+    def abort(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.upload_id != None:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self.upload_id
+            )
+        self.buffer = bytearray()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type == None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+# =========================================================
+# Storage backend writing files into S3-compatible storage
+# =========================================================
+class S3Storage:
+    """
+    Storage backend for downloaded files in an S3-compatible object store (needs the 'boto3' package).
+    Keys are relative paths with '/' separators (e.g. 'Iris/iris.data'), stored under 'prefix' in the bucket.
+    Files are streamed into multipart uploads, so they are never staged on the local disk.
+    bucket: Name of the bucket.
+    prefix: Optional key prefix (a 'folder' in the bucket).
+    part_size: Size of the upload parts, i.e. the most memory held per file being written. At least 5 MB (S3 limit).
+    client: Optional boto3 S3 client. If None, one is created with the remaining keyword arguments (e.g. endpoint_url for S3-compatible servers).
+    There is no locking across processes with this backend.
+    """
+
+    def __init__(
+        self, bucket, prefix="", part_size=8 * 1024 * 1024, client=None, **client_kwargs
+    ):
+        assert part_size >= 5 * 1024 * 1024
+        self.client_kwargs = client_kwargs if client == None else None
+        if client == None:
+            import boto3
+
+            client = boto3.client("s3", **client_kwargs)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.part_size = part_size
+
+    def __getstate__(self):
+        # Clients cannot be pickled: worker processes create their own from the keyword arguments
+        # (so a storage created with an explicit client cannot be passed to other processes)
+        assert self.client_kwargs != None
+        state = self.__dict__.copy()
+        del state["client"]
+        return state
+
+    def __setstate__(self, state):
+        import boto3
+
+        self.__dict__.update(state)
+        self.client = boto3.client("s3", **self.client_kwargs)
+
+    def object_key(self, key):
+        """
+        Returns the key of the object in the bucket.
+        """
+        key = key.strip("/")
+        return self.prefix + "/" + key if self.prefix else key
+
+    def open_write(self, key):
+        """
+        Context manager giving a file-like object to write the contents of a key, streamed as a multipart upload.
+        """
+        return S3MultipartWriter(
+            self.client, self.bucket, self.object_key(key), self.part_size
+        )
+
+    def open_read(self, key):
+        """
+        Opens a key for (streaming, non-seekable) binary reading.
+        """
+        response = self.client.get_object(Bucket=self.bucket, Key=self.object_key(key))
+        return response["Body"]
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+            return True
+        except ClientError:
+            return False
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_key(key))
+
+    def list_keys(self, prefix=""):
+        """
+        Lists the keys stored below the given prefix (a directory).
+        """
+        keys = []
+        paginator = self.client.get_paginator("list_objects_v2")
+        start = self.object_key(prefix) + "/" if prefix else self.object_key("")
+        if start == "/":
+            start = ""
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=start):
+            for item in page.get("Contents", []):
+                key = item["Key"]
+                keys.append(key[len(self.prefix) + 1 :] if self.prefix else key)
+
+        return sorted(keys)
+
+    def lock(self, key):
+        return contextlib.nullcontext()
+
+
+# ==========================================================================
+# Function to fetch a url into a download cache shared between processes
+# ==========================================================================
+def fetch_to_cache(url, cache_dir):
+    """
+    Downloads a url into the shared download cache directory, unless it is already there, and returns the name of the cached file.
+    Only one process (or thread) fetches a given url at a time: the others wait for it and then reuse its result.
+    Cached files are written atomically, and failed downloads (HTTP errors) are never cached.
+    """
+    import requests
+    import hashlib
+    import os
+
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+    cached_filename = os.path.join(cache_dir, key + "-" + url.split("/")[-1])
+    if os.path.exists(cached_filename):
+        return cached_filename
+
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+    with file_lock(cached_filename + ".lock"):
+        if not os.path.exists(cached_filename):
+            r = requests.get(url, stream=True)
+            r.raise_for_status()
+            with r, atomic_open(cached_filename) as f:
+                for chunk in r.iter_content(chunk_size=1024 * 1024):
+                    if chunk:
+                        f.write(chunk)
+
+    return cached_filename
+
+
+# ==================================================================
+# Function to stream back the decompressed contents of a data file
+# ==================================================================
+def stream_compressed_file(filename, chunk_size=1024 * 1024):
+    """
+    Generator yielding the decompressed contents of a file (as downloaded with the 'compression' option) in chunks of bytes.
+    chunk_size: Size (in bytes) of each chunk yielded.
+    """
+    with open_compressed_file(filename, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+# =============================================================
+# Function to read a (possibly compressed) data file in pandas
+# =============================================================
+def read_compressed_file(filename, **kwargs):
+    """
+    Reads a (possibly compressed) downloaded data file directly into a pandas DataFrame.
+    Any extra keyword argument is passed on to pandas.read_csv e.g. header=None or sep=','.
+    """
+    import pandas as pd
+
+    with open_compressed_file(filename, "rb") as f:
+        df = pd.read_csv(f, **kwargs)
+
+    return df
+
+
+# ==================================================================
+# Function to tell the name and compression of a downloaded file
+# ==================================================================
+def compressed_filename(filename, compression):
+    """
+    Returns the name under which a file is stored by download_file with the given compression, and the compression actually applied:
+    None for files which are already compressed archives, and gzip instead of zstd if the 'zstandard' package is not installed.
+    """
+    import importlib.util
+
+    if compression == "zstd" and importlib.util.find_spec("zstandard") == None:
+        compression = "gzip"
+    if filename.endswith(ALREADY_COMPRESSED):
+        compression = None
+    if compression == "gzip":
+        filename = filename + ".gz"
+    elif compression == "zstd":
+        filename = filename + ".zst"
+
+    return filename, compression
+
+
+# ================================
+# File download helper function
+# ================================
+def download_file(
+    url, directory, compression=None, extract=False, cache_dir=None, storage=None
+):
+    """
+    Downloads a file from a given url into the given directory. The file is written atomically (temporary file, then rename).
+    compression: Optional on-the-fly compression of the downloaded file. Could be None (default), 'gzip', or 'zstd'.
+    Files which are already compressed archives (e.g. '.zip', '.gz', '.Z') are always stored as they are.
+    extract: Default is False. If set to True, tar archives (e.g. '.tar.gz') are extracted into the same directory while they are being downloaded.
+    cache_dir: Optional download cache directory shared between processes. The url is fetched only once into the cache (see fetch_to_cache) and copied from there.
+    storage: Optional storage backend (e.g. LocalStorage or S3Storage). The 'directory' is then a key prefix inside the storage. By default, files are written to the local filesystem.
+    Returns the name (key) of the file written, or None if the download failed.
+    """
+    import requests
+
+    assert compression in [None, "gzip", "zstd"]
+
+    if storage == None:
+        storage = LocalStorage()
+
+    local_filename, used_compression = compressed_filename(
+        directory + "/" + url.split("/")[-1], compression
+    )
+    if compression == "zstd" and used_compression == "gzip":
+        print(
+            "The 'zstandard' package is not installed, using gzip compression instead."
+        )
+    compression = used_compression
+
+    try:
+        if cache_dir != None:
+            source = open(fetch_to_cache(url, cache_dir), "rb")
+            chunks = iter(lambda: source.read(1024 * 1024), b"")
+        else:
+            # NOTE the stream=True parameter
+            source = requests.get(url, stream=True)
+            source.raise_for_status()
+            # filter out keep-alive new chunks
+            chunks = (chunk for chunk in source.iter_content(chunk_size=1024) if chunk)
+        with source, storage.open_write(local_filename) as raw:
+            if compression != None:
+                f = open_compressed_file(local_filename, "wb", fileobj=raw)
+            else:
+                f = raw
+            with f:
+                if extract and url.endswith(TAR_EXTENSIONS):
+                    tee = TeeReader(chunks, f)
+                    try:
+                        extracted = extract_tar_stream(tee, directory, storage=storage)
+                        record_extraction(
+                            directory, local_filename, extracted, storage=storage
+                        )
+                    except:
+                        print(f"Sorry, could not extract {url.split('/')[-1]}")
+                    tee.drain()
+                else:
+                    for chunk in chunks:
+                        f.write(chunk)
+    except:
+        print("Sorry could not write this particular file!")
+        # f.flush()
+        return None
+
+    return local_filename
+
+
+# ===================================================================
+# File-like reader which copies the bytes it reads into another file
+# ===================================================================
+class TeeReader:
+    """
+    Read-only file-like object over an iterator of byte chunks (e.g. a streamed HTTP response).
+    Every chunk pulled from the iterator is also written to 'sink', so the stream can be consumed (e.g. extracted) and saved in one pass.
+    """
+
+    def __init__(self, chunks, sink):
+        self.chunks = chunks
+        self.sink = sink
+        self.buffer = b""
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk == None:
+                break
+            self.sink.write(chunk)
+            self.buffer += chunk
+        if size < 0:
+            size = len(self.buffer)
+        data = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        return data
+
+    def drain(self):
+        """
+        Copies the rest of the stream (not consumed by read) into the sink.
+        """
+        for chunk in self.chunks:
+            self.sink.write(chunk)
+        self.buffer = b""
+
+
+# ==========================================================================
+# Helper function to check that an archive member stays inside a directory
+# ==========================================================================
+def safe_extract_path(directory, member_name):
+    """
+    Returns the path (or storage key, with '/' separators) where an archive member should be extracted inside the given directory.
+    Returns None for members which would escape the directory (absolute paths, '..' components), guarding against path traversal.
+    """
+    import os
+
+    name = member_name.replace("\\", "/")
+    parts = [p for p in name.split("/") if p not in ["", "."]]
+    if name.startswith("/") or ":" in name or ".." in parts or len(parts) == 0:
+        return None
+
+    target = directory + "/" + "/".join(parts)
+    # Also guard against existing symbolic links on the local filesystem
+    if os.path.isdir(directory):
+        root = os.path.realpath(directory)
+        if not os.path.realpath(target).startswith(root + os.sep):
+            return None
+
+    return target
+
+
+# =====================================================================
+# Function to extract a tar archive from a (non-seekable) byte stream
+# =====================================================================
+def extract_tar_stream(fileobj, directory, storage=None):
+    """
+    Extracts a (possibly compressed) tar archive read sequentially from a file-like object into the given directory.
+    Only regular files are extracted (directories are created as needed). Links, devices and members escaping the directory are skipped.
+    storage: Optional storage backend to extract into. By default, the local filesystem.
+    Returns the list of extracted files (relative to the directory).
+    """
+    import tarfile
+    import shutil
+
+    if storage == None:
+        storage = LocalStorage()
+
+    extracted = []
+    with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+        for member in tar:
+            target = safe_extract_path(directory, member.name)
+            if target == None or not (member.isfile() or member.isdir()):
+                print(f"Skipping unsafe archive member: {member.name}")
+                continue
+            if member.isdir():
+                continue
+            with tar.extractfile(member) as src, storage.open_write(target) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            extracted.append(target[len(directory) + 1 :])
+
+    return extracted
+
+
+# ==============================================
+# Function to extract a zip archive from a file
+# ==============================================
+def extract_zip_file(filename, directory, storage=None):
+    """
+    Extracts a zip archive (given by its file name or a seekable file object) into the given directory, skipping members escaping the directory.
+    storage: Optional storage backend to extract into. By default, the local filesystem.
+    Returns the list of extracted files (relative to the directory).
+    """
+    import zipfile
+    import shutil
+
+    if storage == None:
+        storage = LocalStorage()
+
+    extracted = []
+    with zipfile.ZipFile(filename) as z:
+        for member in z.infolist():
+            target = safe_extract_path(directory, member.filename)
+            if target == None:
+                print(f"Skipping unsafe archive member: {member.filename}")
+                continue
+            if member.is_dir():
+                continue
+            with z.open(member) as src, storage.open_write(target) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            extracted.append(target[len(directory) + 1 :])
+
+    return extracted
+
+
+# ==========================================================================
+# Function to decompress a Unix 'compress' (.Z, LZW) stream into a file
+# ==========================================================================
+def uncompress_z_stream(src, dst):
+    """
+    Decompresses a '.Z' file (Unix 'compress' format, LZW coding) read from the file-like object 'src' into the file-like object 'dst'.
+    The Python standard library has no support for this format, which is still common on UCI ML repo.
+    """
+    header = src.read(3)
+    if len(header) < 3 or header[:2] != b"\x1f\x9d":
+        raise ValueError("Not a '.Z' (compress) file")
+    maxbits = header[2] & 0x1F
+    block_mode = header[2] & 0x80
+
+    first = 257 if block_mode else 256
+    entries = [bytes([i]) for i in range(256)] + [b""] * (first - 256)
+    n_bits = 9
+    codes_read = 0  # number of codes read since the last change of code width
+    bitbuf = 0
+    bitcount = 0
+    prev = None
+    block = b""
+    position = 0
+
+    def read_bytes(n):
+        # Reads the input in large blocks, whatever the kind of file object
+        nonlocal block, position
+        if position >= len(block):
+            block = src.read(64 * 1024)
+            position = 0
+        data = block[position : position + n]
+        position += len(data)
+        return data
+
+    def skip_to_group_end():
+        # Codes are written in groups of 8: padding follows any change of code width
+        nonlocal bitbuf, bitcount
+        for i in range((-codes_read) % 8):
+            while bitcount < n_bits:
+                byte = read_bytes(1)
+                if not byte:
+                    return
+                bitbuf |= byte[0] << bitcount
+                bitcount += 8
+            bitbuf >>= n_bits
+            bitcount -= n_bits
+
+    while True:
+        if len(entries) > (1 << n_bits) - 1 and n_bits < maxbits:
+            skip_to_group_end()
+            n_bits += 1
+            codes_read = 0
+
+        while bitcount < n_bits:
+            data = read_bytes(n_bits)
+            if not data:
+                break
+            bitbuf |= int.from_bytes(data, "little") << bitcount
+            bitcount += 8 * len(data)
+        if bitcount < n_bits:
+            break
+        code = bitbuf & ((1 << n_bits) - 1)
+        bitbuf >>= n_bits
+        bitcount -= n_bits
+        codes_read += 1
+
+        if code == 256 and block_mode:
+            skip_to_group_end()
+            entries = entries[:first]
+            n_bits = 9
+            codes_read = 0
+            prev = None
+            continue
+
+        if code < len(entries):
+            entry = entries[code]
+        elif code == len(entries) and prev != None:
+            entry = prev + prev[:1]
+        else:
+            raise ValueError("Corrupt '.Z' (compress) file")
+        dst.write(entry)
+
+        if prev != None and len(entries) < (1 << maxbits):
+            entries.append(prev + entry[:1])
+        prev = entry
+
+
+# ======================================================================
+# Function to extract any supported archive (zip, tar, .Z) from a file
+# ======================================================================
+def extract_archive(filename, directory=None, storage=None):
+    """
+    Extracts a downloaded archive ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz' or '.Z') into the given directory.
+    '.Z' files are decompressed (and further extracted if they contain a tar archive).
+    directory: Directory to extract into. By default, the directory of the archive.
+    storage: Optional storage backend holding the archive and receiving the extracted files. By default, the local filesystem.
+    Zip archives in a non-seekable storage (e.g. S3) are first spooled to a temporary file.
+    The extracted files are recorded in the manifest of the directory. Returns the list of extracted files (relative to the directory).
+    """
+    import os
+    import shutil
+    import tempfile
+
+    if storage == None:
+        storage = LocalStorage()
+    if directory == None:
+        directory = os.path.dirname(filename)
+
+    if filename.endswith(TAR_EXTENSIONS):
+        with storage.open_read(filename) as f:
+            extracted = extract_tar_stream(f, directory, storage=storage)
+    elif filename.endswith(".zip"):
+        with storage.open_read(filename) as f:
+            if f.seekable():
+                extracted = extract_zip_file(f, directory, storage=storage)
+            else:
+                with tempfile.TemporaryFile() as spool:
+                    shutil.copyfileobj(f, spool, 1024 * 1024)
+                    spool.seek(0)
+                    extracted = extract_zip_file(spool, directory, storage=storage)
+    elif filename.endswith(".Z"):
+        target = safe_extract_path(directory, os.path.basename(filename)[:-2])
+        if target == None:
+            return []
+        with storage.open_read(filename) as src, storage.open_write(target) as dst:
+            uncompress_z_stream(src, dst)
+        extracted = [target[len(directory) + 1 :]]
+        if target.endswith(".tar"):
+            with storage.open_read(target) as f:
+                extracted = extracted + extract_tar_stream(
+                    f, directory, storage=storage
+                )
+    else:
+        print(f"Not a supported archive: {os.path.basename(filename)}")
+        return []
+
+    record_extraction(directory, filename, extracted, storage=storage)
+
+    return extracted
+
+
+# ===========================================================
+# Function to record extracted files in a directory manifest
+# ===========================================================
+def record_extraction(directory, archive, extracted, storage=None):
+    """
+    Records the files extracted from an archive in the manifest (JSON file) of the directory, which maps each archive name to its extracted files.
+    Safe to call from several threads (and, with local storage, processes) at once.
+    storage: Optional storage backend holding the manifest. By default, the local filesystem.
+    """
+    import os
+    import json
+
+    if storage == None:
+        storage = LocalStorage()
+
+    manifest_file = directory + "/" + EXTRACTION_MANIFEST
+    with MANIFEST_LOCK, storage.lock(manifest_file):
+        manifest = {}
+        if storage.exists(manifest_file):
+            with storage.open_read(manifest_file) as f:
+                manifest = json.loads(f.read().decode("utf-8"))
+        manifest[os.path.basename(archive)] = extracted
+        with storage.open_write(manifest_file) as f:
+            f.write(json.dumps(manifest, indent=2).encode("utf-8"))
+
+
+# =================================================================
+# Helper function returning the local directory of a dataset name
+# =================================================================
+def dataset_directory(directory):
+    """
+    Returns the local directory where the files of a dataset (named by 'directory') are downloaded.
+    """
+    import os
+
+    cwd = os.getcwd()
     directory = directory.replace(":", "-")
-    local_directory = cwd + "\\" + str(directory)
-    if not os.path.exists(local_directory):
+    local_directory = os.path.join(cwd, str(directory))
+
+    return local_directory
+
+
+# ===================================================================
+# Function to read the files and subdirectories of a listing page
+# ===================================================================
+def read_directory_listing(url):
+    """
+    Reads a directory listing page (e.g. of machine-learning-databases) and returns two lists of absolute urls: files and subdirectories.
+    Only links pointing below the given url are kept, so sorting links, the parent directory and external links are ignored.
+    """
+    import urllib.request, urllib.parse, urllib.error
+    from bs4 import BeautifulSoup
+    import ssl
+
+    # Ignore SSL certificate errors
+    ctx = ssl.create_default_context()
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+
+    if not url.endswith("/"):
+        url = url + "/"
+
+    uh = urllib.request.urlopen(url, context=ctx)
+    html = uh.read().decode(errors="replace")
+    soup = BeautifulSoup(html, "html5lib")
+
+    files = []
+    subdirectories = []
+    for link in soup.find_all("a"):
+        href = link.attrs.get("href")
+        if href == None or href.startswith(("?", "#", "mailto:")):
+            continue
+        link_url = urllib.parse.urljoin(url, href)
+        link_url = urllib.parse.urldefrag(link_url)[0].split("?")[0]
+        if not link_url.startswith(url) or link_url == url:
+            continue
+        if link_url.endswith("/"):
+            if link_url not in subdirectories:
+                subdirectories.append(link_url)
+        elif link_url not in files:
+            files.append(link_url)
+
+    return files, subdirectories
+
+
+# ==============================================================================
+# Function to walk a dataset directory recursively and build a file plan
+# ==============================================================================
+def walk_dataset_directory(
+    url, max_depth=2, max_workers=8, msg_flag=False, failed=None
+):
+    """
+    Walks the directory listing at the given url and its subdirectories (up to 'max_depth' levels below it) and builds a flat plan of files to download.
+    The listings of sibling subdirectories are fetched concurrently, and every directory is visited only once.
+    max_depth: Number of subdirectory levels to descend. 0 only reads the given page.
+    max_workers: Number of listings fetched at the same time.
+    msg_flag: Controls verbosity.
+    failed: Optional list, to which the urls of the directory listings which could not be read are appended.
+    Returns a list of (file url, relative path) tuples. The relative path (e.g. 'subdir/file.data') tells where to store the file inside the dataset directory.
+    """
+    import urllib.parse
+    from concurrent.futures import ThreadPoolExecutor
+
+    if not url.endswith("/"):
+        url = url + "/"
+
+    def read_listing(directory_url):
         try:
-            os.makedirs(local_directory)
+            return read_directory_listing(directory_url)
         except:
-            print(f"Cannot create directory: {directory}")
+            print(f"Could not read the directory listing: {directory_url}")
+            if failed != None:
+                failed.append(directory_url)
+            return [], []
+
+    plan = []
+    planned = set()
+    visited = set([url])
+    level = [url]
+    depth = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while len(level) > 0:
+            next_level = []
+            for files, subdirectories in executor.map(read_listing, level):
+                for file_url in files:
+                    if file_url not in planned:
+                        planned.add(file_url)
+                        relative_path = urllib.parse.unquote(file_url[len(url) :])
+                        plan.append((file_url, relative_path))
+                for directory_url in subdirectories:
+                    if directory_url not in visited and depth < max_depth:
+                        visited.add(directory_url)
+                        next_level.append(directory_url)
+            if msg_flag:
+                print(
+                    f"Depth {depth}: {len(level)} directories read, {len(plan)} files found so far"
+                )
+            level = next_level
+            depth += 1
 
-    if download_flag:
-        # Ignore SSL certificate errors
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
+    return plan
 
-        uh = urllib.request.urlopen(url, context=ctx)
-        html = uh.read().decode()
-        soup = BeautifulSoup(html, "html5lib")
 
-        links = []
-        for link in soup.find_all("a"):
-            links.append(link.attrs["href"])
+# ==================================================================
+# Function to read the size and validators of a remote file
+# ==================================================================
+def remote_file_metadata(url):
+    """
+    Reads the size, ETag and Last-Modified date of a remote file with a HEAD request.
+    Returns a dictionary with the keys 'size', 'etag' and 'last_modified' (None when the server does not send them),
+    or None if the request failed.
+    """
+    import requests
+
+    try:
+        r = requests.head(url, allow_redirects=True, timeout=60)
+        r.raise_for_status()
+    except:
+        return None
+
+    size = r.headers.get("Content-Length")
 
-        links_to_download = []
+    return {
+        "size": int(size) if size != None and size.isdigit() else None,
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+    }
 
-        if "Index" in links:
-            idx = links.index("Index")
-        else:
-            idx = len(links) - 2
-        for i in range(idx + 1, len(links)):
-            links_to_download.append(url + str(links[i]))
 
-        for file_url in links_to_download:
-            download_file(file_url, local_directory)
+# ==================================================================
+# Function to compare a remote file with its local sync metadata
+# ==================================================================
+def remote_file_unchanged(entry, remote):
+    """
+    Tells if a remote file is unchanged since it was downloaded, by comparing its metadata (see remote_file_metadata)
+    with the metadata recorded at that time: the ETag if both have one, otherwise the Last-Modified date, and the size.
+    A file without any validator is always considered changed.
+    """
+    if entry == None or remote == None:
+        return False
+    if remote["size"] != entry.get("size"):
+        return False
+    if remote["etag"] != None and entry.get("etag") != None:
+        return remote["etag"] == entry["etag"]
+    if remote["last_modified"] != None:
+        return remote["last_modified"] == entry.get("last_modified")
+
+    return False
+
+
+# ==================================================================
+# Function to check a local file downloaded before syncing existed
+# ==================================================================
+def local_file_matches(filename, remote, check_size=True):
+    """
+    Tells if a local file downloaded without sync metadata (e.g. before the sync mode was used) matches a remote file:
+    same size, and not older than the Last-Modified date of the remote file.
+    check_size: Default is True. Set it to False for files stored compressed, whose size differs from the remote one.
+    They then only match if the remote file has a Last-Modified date.
+    """
+    import os
+    from email.utils import parsedate_to_datetime
+
+    if remote == None or not os.path.isfile(filename):
+        return False
+    if check_size:
+        if remote["size"] == None or os.path.getsize(filename) != remote["size"]:
+            return False
+    elif remote["last_modified"] == None:
+        return False
+    if remote["last_modified"] != None:
+        try:
+            modified = parsedate_to_datetime(remote["last_modified"]).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return os.path.getmtime(filename) >= modified
+
+    return True
+
+
+# ==================================================================
+# Function to delete a synced file (and the files extracted from it)
+# ==================================================================
+def delete_synced_file(filename, storage=None):
+    """
+    Deletes a downloaded file which vanished upstream, together with the files extracted from it
+    (as listed in the extraction manifest of its directory).
+    storage: Optional storage backend holding the file. By default, the local filesystem.
+    Returns the number of files deleted.
+    """
+    import json
+
+    if storage == None:
+        storage = LocalStorage()
+
+    deleted = 0
+    if storage.exists(filename):
+        storage.delete(filename)
+        deleted += 1
+
+    directory, archive = filename.rsplit("/", 1)
+    manifest_file = directory + "/" + EXTRACTION_MANIFEST
+    with MANIFEST_LOCK, storage.lock(manifest_file):
+        if storage.exists(manifest_file):
+            with storage.open_read(manifest_file) as f:
+                manifest = json.loads(f.read().decode("utf-8"))
+            if archive in manifest:
+                for extracted in manifest.pop(archive):
+                    if storage.exists(directory + "/" + extracted):
+                        storage.delete(directory + "/" + extracted)
+                        deleted += 1
+                with storage.open_write(manifest_file) as f:
+                    f.write(json.dumps(manifest, indent=2).encode("utf-8"))
+
+    return deleted
+
+
+# ==================================================================
+# Function to print the summary of a sync
+# ==================================================================
+def print_sync_summary(sync_summary):
+    """
+    Prints the summary of a sync (the dictionary filled by download_dataset_url in sync mode): files checked,
+    downloaded, unchanged and deleted, bytes downloaded and bytes saved by skipping the unchanged files.
+    """
+
+    def size_text(n):
+        for unit in ["bytes", "KB", "MB", "GB"]:
+            if n < 1024 or unit == "GB":
+                return f"{n:.0f} {unit}" if unit == "bytes" else f"{n:.1f} {unit}"
+            n = n / 1024
+
+    print(
+        f"Sync summary: {sync_summary['checked']} files checked, "
+        f"{sync_summary['downloaded']} downloaded ({size_text(sync_summary['bytes_downloaded'])}), "
+        f"{sync_summary['unchanged']} unchanged ({size_text(sync_summary['bytes_saved'])} saved), "
+        f"{sync_summary['deleted']} deleted."
+    )
+
+
+# =====================================================
+# Function for downloading the data set from a page
+# =====================================================
+def download_dataset_url(
+    url,
+    directory,
+    msg_flag=False,
+    download_flag=True,
+    compression=None,
+    extract=False,
+    extract_workers=4,
+    max_depth=2,
+    cache_dir=None,
+    storage=None,
+    sync=False,
+    delete=False,
+    sync_summary=None,
+):
+    """
+    Download all the files from the links in the given url, descending into its subdirectories (up to 'max_depth' levels).
+    msg_flag: Controls verbosity.
+    download_flag: Default is True. If set to False, only creates the directories but does not initiate download (for testing purpose).
+    compression: Optional on-the-fly compression of the downloaded files. Could be None (default), 'gzip', or 'zstd'.
+    extract: Default is False. If set to True, archives are extracted into the dataset directory: tar archives while they are being downloaded,
+    zip and '.Z' files as soon as they are complete (by a pool of worker threads, while the next files are downloaded).
+    The extracted files are listed in the manifest 'extracted_files.json' of the dataset directory.
+    extract_workers: Number of worker threads extracting zip and '.Z' files.
+    max_depth: Number of subdirectory levels to descend. 0 only downloads the files linked from the given page.
+    cache_dir: Optional download cache directory shared between processes, so that each file is fetched only once even if several processes download the same datasets.
+    storage: Optional storage backend (e.g. S3Storage) receiving the files under a folder named after the dataset, instead of the current directory.
+    sync: Default is False. If set to True, the size and ETag/Last-Modified of every remote file are read (HEAD requests) and compared
+    with the metadata recorded in the file 'sync_metadata.json' of the dataset directory, and only new or changed files are downloaded.
+    Changed files bypass the download cache. Files downloaded before the sync mode was used are kept if their size and date match
+    (only their date for files stored compressed).
+    delete: Default is False. If set to True (with sync), files which vanished upstream are deleted, with the files extracted from them.
+    Nothing is deleted if a directory listing could not be read.
+    sync_summary: Optional dictionary accumulating the sync counts over several datasets (see print_sync_summary).
+    If None, the summary of this dataset is printed.
+    Returns the list of file urls which could not be downloaded (empty if all files were downloaded).
+    """
+
+    from concurrent.futures import ThreadPoolExecutor
+    import os
+    import json
+
+    if url == "URL not available":
+        return None
+
+    if storage == None:
+        local_directory = dataset_directory(directory)
+        if not os.path.exists(local_directory):
+            try:
+                os.makedirs(local_directory)
+            except:
+                print(f"Cannot create directory: {directory}")
+    else:
+        local_directory = directory.replace(":", "-")
+
+    if download_flag:
+        failed_listings = []
+        plan = walk_dataset_directory(
+            url, max_depth=max_depth, msg_flag=msg_flag, failed=failed_listings
+        )
+
+        if sync:
+            store = storage if storage != None else LocalStorage()
+            print_summary = sync_summary == None
+            if print_summary:
+                sync_summary = {}
+            for key in [
+                "checked",
+                "downloaded",
+                "unchanged",
+                "deleted",
+                "bytes_downloaded",
+                "bytes_saved",
+            ]:
+                sync_summary.setdefault(key, 0)
+            metadata_file = local_directory + "/" + SYNC_MANIFEST
+            metadata = {}
+            if store.exists(metadata_file):
+                with store.open_read(metadata_file) as f:
+                    metadata = json.loads(f.read().decode("utf-8"))
+            # File names in the metadata are relative to the dataset directory
+            urls = [file_url for file_url, relative_path in plan]
+            with ThreadPoolExecutor(max_workers=8) as head_executor:
+                remote = dict(zip(urls, head_executor.map(remote_file_metadata, urls)))
+            new_metadata = {}
+
+        executor = ThreadPoolExecutor(max_workers=extract_workers) if extract else None
+        extractions = {}
+        failed = []
+        for file_url, relative_path in plan:
+            target = safe_extract_path(local_directory, relative_path)
+            if target == None:
+                print(f"Skipping unsafe file path: {relative_path}")
+                continue
+            file_directory = target.rsplit("/", 1)[0]
+            file_cache_dir = cache_dir
+            if sync:
+                sync_summary["checked"] += 1
+                entry = metadata.get(file_url)
+                size = (remote[file_url] or {}).get("size") or 0
+                if entry != None and store.exists(
+                    local_directory + "/" + entry["file"]
+                ):
+                    unchanged = remote_file_unchanged(entry, remote[file_url])
+                else:
+                    # A file downloaded before the sync mode was used has no metadata yet
+                    expected, file_compression = compressed_filename(
+                        target, compression
+                    )
+                    entry = {"file": expected[len(local_directory) + 1 :]}
+                    unchanged = isinstance(store, LocalStorage) and local_file_matches(
+                        store.path(expected),
+                        remote[file_url],
+                        check_size=file_compression == None,
+                    )
+                if unchanged:
+                    new_metadata[file_url] = dict(entry, **remote[file_url])
+                    sync_summary["unchanged"] += 1
+                    sync_summary["bytes_saved"] += size
+                    continue
+                if metadata.get(file_url) != None:
+                    # The cached copy of a changed file is stale
+                    file_cache_dir = None
+            local_filename = download_file(
+                file_url,
+                file_directory,
+                compression=compression,
+                extract=extract,
+                cache_dir=file_cache_dir,
+                storage=storage,
+            )
+            if local_filename == None:
+                failed.append(file_url)
+                continue
+            if sync:
+                if remote[file_url] != None:
+                    new_metadata[file_url] = dict(
+                        remote[file_url],
+                        file=local_filename[len(local_directory) + 1 :],
+                    )
+                sync_summary["downloaded"] += 1
+                sync_summary["bytes_downloaded"] += size
+            if extract and local_filename.endswith((".zip", ".Z")):
+                extractions[local_filename] = executor.submit(
+                    extract_archive, local_filename, file_directory, storage
+                )
+
+        if executor != None:
+            executor.shutdown(wait=True)
+            for local_filename, future in extractions.items():
+                if future.exception() != None:
+                    print(
+                        f"Sorry, could not extract {os.path.basename(local_filename)}"
+                    )
+
+        if sync:
+            vanished = [u for u in metadata if u not in remote]
+            if delete and len(failed_listings) > 0:
+                print(
+                    f"Not deleting the files which vanished upstream: some directory listings of {url} could not be read."
+                )
+            for file_url in vanished:
+                if delete and len(failed_listings) == 0:
+                    sync_summary["deleted"] += delete_synced_file(
+                        local_directory + "/" + metadata[file_url]["file"], store
+                    )
+                else:
+                    new_metadata[file_url] = metadata[file_url]
+            # Keep the metadata of files which could not be downloaded this time
+            for file_url in failed:
+                if file_url in metadata:
+                    new_metadata[file_url] = metadata[file_url]
+            with store.open_write(metadata_file) as f:
+                f.write(json.dumps(new_metadata, indent=2).encode("utf-8"))
+            if print_summary:
+                print_sync_summary(sync_summary)
 
         if msg_flag:
             print(f"Downloaded dataset from {url}")
 
+        return failed
+
+    return []
+
 
 # =================================================================================================
 # User API Function for downloading a given number of datasets and storing in a local directory
 # =================================================================================================
-def download_datasets(num=10, local_database=None, msg_flag=True, download_flag=True):
+def download_datasets(
+    num=10,
+    local_database=None,
+    msg_flag=True,
+    download_flag=True,
+    compression=None,
+    extract=False,
+    cache_dir=None,
+    storage=None,
+    sync=False,
+    delete=False,
+):
     """
     Downloads datasets and puts them in a local directory named after the dataset.
     By default downloads first 10 datasets only. User can choose the number of dataets to be downloaded.
     msg_flag: Controls verbosity.
 	download_flag: Default is True. If set to False, only creates the directories but does not initiate download (for testing purpose).
+    compression: Optional on-the-fly compression of the downloaded files. Could be None (default), 'gzip', or 'zstd'.
+    extract: Default is False. If set to True, downloaded archives (zip, tar, '.Z') are extracted into the dataset directory.
+    cache_dir: Optional download cache directory shared between processes, so that each file is fetched only once.
+    storage: Optional storage backend (e.g. S3Storage) receiving the datasets instead of the current directory.
+    sync: Default is False. If set to True, only new or changed files are downloaded into an existing mirror (see download_dataset_url), and a summary of the bytes saved is printed.
+    delete: Default is False. If set to True (with sync), files which vanished upstream are deleted from the mirror.
     """
 
     import pandas as pd
@@ -572,17 +2432,14 @@ def download_datasets(num=10, local_database=None, msg_flag=True, download_flag=
         df = pd.read_csv(local_database, index_col="Dataset")
     else:
         local_df_flag = False
-        if msg_flag:
-            print(
-                "Local database not supplied.\nBuilding the master database by crawling the website..."
-            )
-        df = build_full_dataframe(msg_flag=False)
-        if msg_flag:
-            print("Done!")
+        df = cached_catalog("database", msg_flag=msg_flag)
+        if df is None:
+            return None
 
     if num < 1:
         print("Invalid entry for the number of datasets.")
     else:
+        sync_summary = {}
         for i in range(num):
             if msg_flag:
                 print(f"Downloading dataset(s) for: {df['Name'][i]}")
@@ -591,19 +2448,45 @@ def download_datasets(num=10, local_database=None, msg_flag=True, download_flag=
                 df["Name"][i],
                 msg_flag=False,
                 download_flag=download_flag,
+                compression=compression,
+                extract=extract,
+                cache_dir=cache_dir,
+                storage=storage,
+                sync=sync,
+                delete=delete,
+                sync_summary=sync_summary,
             )
         print("\nFinished downloading.")
+        if sync:
+            print_sync_summary(sync_summary)
 
 
 # ============================================================================
 # User API function to download dataset by searching a for particular name
 # ============================================================================
-def download_dataset_name(name, local_database=None, msg_flag=True, download_flag=True):
+def download_dataset_name(
+    name,
+    local_database=None,
+    msg_flag=True,
+    download_flag=True,
+    compression=None,
+    extract=False,
+    cache_dir=None,
+    storage=None,
+    sync=False,
+    delete=False,
+):
     """
     Downloads a particular dataset by searching the given name.
     local_database: Name of the database (CSV file) stored locally i.e. in the same directory, which contains information about all the datasets on UCI ML repo. 
     msg_flag: Controls verbosity
     download_flag: Default is True. If set to False, only creates the directories but does not initiate download (for testing purpose)
+    compression: Optional on-the-fly compression of the downloaded files. Could be None (default), 'gzip', or 'zstd'.
+    extract: Default is False. If set to True, downloaded archives (zip, tar, '.Z') are extracted into the dataset directory.
+    cache_dir: Optional download cache directory shared between processes, so that each file is fetched only once.
+    storage: Optional storage backend (e.g. S3Storage) receiving the datasets instead of the current directory.
+    sync: Default is False. If set to True, only new or changed files are downloaded into an existing mirror (see download_dataset_url), and a summary of the bytes saved is printed.
+    delete: Default is False. If set to True (with sync), files which vanished upstream are deleted from the mirror.
     """
     import pandas as pd
 
@@ -612,13 +2495,9 @@ def download_dataset_name(name, local_database=None, msg_flag=True, download_fla
         df = pd.read_csv(local_database, index_col="Dataset")
     else:
         local_df_flag = False
-        if msg_flag:
-            print(
-                "Local database not supplied.\nBuilding the master database by crawling the website..."
-            )
-        df = build_full_dataframe(msg_flag=False)
-        if msg_flag:
-            print("Done!")
+        df = cached_catalog("database", msg_flag=msg_flag)
+        if df is None:
+            return None
 
     urls_to_download = {}
 
@@ -634,6 +2513,7 @@ def download_dataset_name(name, local_database=None, msg_flag=True, download_fla
                 f"{len(urls_to_download)} instances of search term found including partial match. Downloading datasets for all...\n"
             )
 
+        sync_summary = {}
         for u in urls_to_download:
             if msg_flag:
                 print(f"Downloading dataset(s) for: {u}")
@@ -642,31 +2522,111 @@ def download_dataset_name(name, local_database=None, msg_flag=True, download_fla
                 directory=u,
                 msg_flag=False,
                 download_flag=download_flag,
+                compression=compression,
+                extract=extract,
+                cache_dir=cache_dir,
+                storage=storage,
+                sync=sync,
+                delete=delete,
+                sync_summary=sync_summary,
             )
 
         print("\nFinished downloading.")
+        if sync:
+            print_sync_summary(sync_summary)
+
+
+# =========================================================
+# Function to download all datasets from a stream of records
+# =========================================================
+def download_dataset_records(
+    records,
+    msg_flag=False,
+    download_flag=True,
+    compression=None,
+    extract=False,
+    cache_dir=None,
+    storage=None,
+    sync=False,
+    delete=False,
+):
+    """
+    Downloads the datasets of an iterable of catalog records (dictionaries with 'Name' and 'Datapage URL' keys), each as soon as it arrives.
+    Chained with iter_dataset_records (e.g. through a filtering generator expression), the downloads overlap with the crawl.
+    msg_flag: Controls verbosity
+    download_flag: Default is True. If set to False, only creates the directories but does not initiate download (for testing purpose)
+    compression: Optional on-the-fly compression of the downloaded files. Could be None (default), 'gzip', or 'zstd'.
+    extract: Default is False. If set to True, downloaded archives (zip, tar, '.Z') are extracted into the dataset directory.
+    cache_dir: Optional download cache directory shared between processes, so that each file is fetched only once.
+    storage: Optional storage backend (e.g. S3Storage) receiving the datasets instead of the current directory.
+    sync: Default is False. If set to True, only new or changed files are downloaded into an existing mirror (see download_dataset_url), and a summary of the bytes saved is printed.
+    delete: Default is False. If set to True (with sync), files which vanished upstream are deleted from the mirror.
+    Returns the names of the datasets processed.
+    """
+    names = []
+    sync_summary = {}
+    for record in records:
+        if msg_flag:
+            print(f"Downloading the dataset: {record['Name']}")
+        download_dataset_url(
+            record["Datapage URL"],
+            record["Name"],
+            download_flag=download_flag,
+            compression=compression,
+            extract=extract,
+            cache_dir=cache_dir,
+            storage=storage,
+            sync=sync,
+            delete=delete,
+            sync_summary=sync_summary,
+        )
+        names.append(record["Name"])
+    if sync:
+        print_sync_summary(sync_summary)
+
+    return names
 
 
 # =========================================================
 # Function to download all datasets in a given dataframe
 # =========================================================
-def download_all_from_dataframe(df, msg_flag=False, download_flag=True):
+def download_all_from_dataframe(
+    df,
+    msg_flag=False,
+    download_flag=True,
+    compression=None,
+    extract=False,
+    cache_dir=None,
+    storage=None,
+    sync=False,
+    delete=False,
+):
     """
     Downloads all datasets which appear in the given dataframe.
     Assumes that the datapage URL information is in the dataframe.
     msg_flag: Controls verbosity
     download_flag: Default is True. If set to False, only creates the directories but does not initiate download (for testing purpose)
+    compression: Optional on-the-fly compression of the downloaded files. Could be None (default), 'gzip', or 'zstd'.
+    extract: Default is False. If set to True, downloaded archives (zip, tar, '.Z') are extracted into the dataset directory.
+    cache_dir: Optional download cache directory shared between processes, so that each file is fetched only once.
+    storage: Optional storage backend (e.g. S3Storage) receiving the datasets instead of the current directory.
+    sync: Default is False. If set to True, only new or changed files are downloaded into an existing mirror (see download_dataset_url), and a summary of the bytes saved is printed.
+    delete: Default is False. If set to True (with sync), files which vanished upstream are deleted from the mirror.
     """
 
-    nrows = df.shape[0]
     if download_flag == False:
         print("Not downloading anything, just creating empty directories.\n")
-    for r in range(nrows):
-        if msg_flag:
-            print(f"Downloading the dataset: {df.iloc[r]['Name']}")
-        download_dataset_url(
-            df.iloc[r]["Datapage URL"], df.iloc[r]["Name"], download_flag=download_flag
-        )
+    download_dataset_records(
+        df[["Name", "Datapage URL"]].to_dict("records"),
+        msg_flag=msg_flag,
+        download_flag=download_flag,
+        compression=compression,
+        extract=extract,
+        cache_dir=cache_dir,
+        storage=storage,
+        sync=sync,
+        delete=delete,
+    )
 
 
 # =======================================================
@@ -678,6 +2638,12 @@ def download_datasets_size(
     local_table=None,
     msg_flag=False,
     download_flag=True,
+    compression=None,
+    extract=False,
+    cache_dir=None,
+    storage=None,
+    sync=False,
+    delete=False,
 ):
     """
     Downloads all datasets which satisfy the 'size' criteria.
@@ -686,6 +2652,12 @@ def download_datasets_size(
     local_table: Name of the database (CSV file) stored locally i.e. in the same directory, which contains features information about all the datasets on UCI ML repo i.e. number of samples, type of machine learning task to be performed with the dataset. 
     msg_flag: Controls verbosity
     download_flag: Default is True. If set to False, only creates the directories but does not initiate download (for testing purpose)
+    compression: Optional on-the-fly compression of the downloaded files. Could be None (default), 'gzip', or 'zstd'.
+    extract: Default is False. If set to True, downloaded archives (zip, tar, '.Z') are extracted into the dataset directory.
+    cache_dir: Optional download cache directory shared between processes, so that each file is fetched only once.
+    storage: Optional storage backend (e.g. S3Storage) receiving the datasets instead of the current directory.
+    sync: Default is False. If set to True, only new or changed files are downloaded into an existing mirror (see download_dataset_url), and a summary of the bytes saved is printed.
+    delete: Default is False. If set to True (with sync), files which vanished upstream are deleted from the mirror.
     """
     import pandas as pd
 
@@ -698,11 +2670,9 @@ def download_datasets_size(
         df = df_local
     else:
         local_df_flag = False
-        print(
-            "Local database not supplied.\nBuilding the master database by crawling the website..."
-        )
-        df = build_full_dataframe(msg_flag=False)
-        print("Master database build done!")
+        df = cached_catalog("database", msg_flag=msg_flag)
+        if df is None:
+            return None
 
     if local_table != None:
         local_table_flag = True
@@ -710,17 +2680,24 @@ def download_datasets_size(
         df_clean = clean_dataset_table(table_local, msg_flag=msg_flag)
     else:
         local_table_flag = False
-        print(
-            "Local table not supplied.\nBuilding the master table by reading from the website..."
-        )
-        df_table = read_dataset_table(msg_flag=msg_flag)
+        df_table = cached_catalog("table", msg_flag=msg_flag)
+        if df_table is None:
+            return None
         df_clean = clean_dataset_table(df_table, msg_flag=msg_flag)
 
     df_merged = df_clean.merge(df, on="Name")
     df_filter = df_merged[df_merged["Sample size"] == str(size)]
 
     download_all_from_dataframe(
-        df_filter, msg_flag=msg_flag, download_flag=download_flag
+        df_filter,
+        msg_flag=msg_flag,
+        download_flag=download_flag,
+        compression=compression,
+        extract=extract,
+        cache_dir=cache_dir,
+        storage=storage,
+        sync=sync,
+        delete=delete,
     )
 
 
@@ -733,6 +2710,12 @@ def download_datasets_task(
     local_table=None,
     msg_flag=False,
     download_flag=True,
+    compression=None,
+    extract=False,
+    cache_dir=None,
+    storage=None,
+    sync=False,
+    delete=False,
 ):
     """
     Downloads all datasets which satisfy the size criteria.
@@ -747,6 +2730,12 @@ def download_datasets_task(
 	local_table: Name of the database (CSV file) stored locally i.e. in the same directory, which contains features information about all the datasets on UCI ML repo i.e. number of samples, type of machine learning task to be performed with the dataset. 
 	msg_flag: Controls verbosity
     download_flag: Default is True. If set to False, only creates the directories but does not initiate download (for testing purpose).
+    compression: Optional on-the-fly compression of the downloaded files. Could be None (default), 'gzip', or 'zstd'.
+    extract: Default is False. If set to True, downloaded archives (zip, tar, '.Z') are extracted into the dataset directory.
+    cache_dir: Optional download cache directory shared between processes, so that each file is fetched only once.
+    storage: Optional storage backend (e.g. S3Storage) receiving the datasets instead of the current directory.
+    sync: Default is False. If set to True, only new or changed files are downloaded into an existing mirror (see download_dataset_url), and a summary of the bytes saved is printed.
+    delete: Default is False. If set to True (with sync), files which vanished upstream are deleted from the mirror.
     """
     import pandas as pd
 
@@ -755,26 +2744,1145 @@ def download_datasets_task(
         df = pd.read_csv(local_database, index_col="Dataset")
     else:
         local_df_flag = False
-        print(
-            "Local database not supplied.\nBuilding the master database by crawling the website..."
-        )
-        df = build_full_dataframe(msg_flag=False)
-        print("Master database build done!")
+        df = cached_catalog("database", msg_flag=msg_flag)
+        if df is None:
+            return None
 
     if local_table != None:
         local_table_flag = True
         df_clean = pd.read_csv(local_table)
     else:
         local_table_flag = False
-        print(
-            "Local table not supplied.\nBuilding the master table by reading from the website..."
-        )
-        df_table = read_dataset_table(msg_flag=msg_flag)
+        df_table = cached_catalog("table", msg_flag=msg_flag)
+        if df_table is None:
+            return None
         df_clean = clean_dataset_table(df_table, msg_flag=msg_flag)
 
     df_merged = df_clean.merge(df, on="Name")
     df_filter = df_merged[df_merged["Default Task"] == str(task)]
 
     download_all_from_dataframe(
-        df_filter, msg_flag=msg_flag, download_flag=download_flag
+        df_filter,
+        msg_flag=msg_flag,
+        download_flag=download_flag,
+        compression=compression,
+        extract=extract,
+        cache_dir=cache_dir,
+        storage=storage,
+        sync=sync,
+        delete=delete,
+    )
+
+
+# ==========================================================================
+# Context manager for a write transaction on the shared work queue
+# ==========================================================================
+@contextlib.contextmanager
+def work_queue_transaction(queue_file):
+    """
+    Opens the download work queue (an SQLite database, created if needed) and yields a connection inside an immediate
+    (write-locking) transaction, which is committed on exit or rolled back if an exception was raised.
+    Concurrent workers (processes or nodes sharing the file) wait for each other's transactions.
+    """
+    import sqlite3
+
+    con = sqlite3.connect(queue_file, timeout=60, isolation_level=None)
+    try:
+        con.execute(
+            "CREATE TABLE IF NOT EXISTS datasets ("
+            "name TEXT PRIMARY KEY, url TEXT NOT NULL, "
+            "status TEXT NOT NULL DEFAULT 'pending', worker TEXT, lease_expires REAL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, error TEXT, updated REAL)"
+        )
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            yield con
+        except:
+            con.execute("ROLLBACK")
+            raise
+        con.execute("COMMIT")
+    finally:
+        con.close()
+
+
+# ==========================================================================
+# Function to load the catalog of datasets into the shared work queue
+# ==========================================================================
+def init_work_queue(queue_file="UCI work queue.db", local_database=None, msg_flag=True):
+    """
+    Loads the datasets of the catalog into a durable download work queue, an SQLite database which can be put on a
+    filesystem shared by several nodes. Datasets already in the queue keep their state, so running it again is safe.
+    queue_file: Name of the work queue (SQLite file).
+    local_database: Name of the database (CSV file) stored locally i.e. in the same directory, which contains information about all the datasets on UCI ML repo.
+    msg_flag: Controls verbosity
+    Returns the number of datasets added to the queue.
+    """
+    import time
+    import pandas as pd
+
+    if local_database != None:
+        df = pd.read_csv(local_database, index_col="Dataset")
+    else:
+        df = cached_catalog("database", msg_flag=msg_flag)
+        if df is None:
+            return 0
+
+    df = df[df["Datapage URL"] != "URL not available"]
+    now = time.time()
+    with work_queue_transaction(queue_file) as con:
+        before = con.total_changes
+        con.executemany(
+            "INSERT OR IGNORE INTO datasets (name, url, updated) VALUES (?, ?, ?)",
+            [(name, url, now) for name, url in zip(df["Name"], df["Datapage URL"])],
+        )
+        added = con.total_changes - before
+
+    if msg_flag:
+        print(f"{added} datasets added to the work queue {queue_file}")
+
+    return added
+
+
+# ==========================================================================
+# Function to lease the next dataset to download from the work queue
+# ==========================================================================
+def lease_dataset(queue_file, worker_id, lease_seconds=600, max_attempts=3):
+    """
+    Leases the next pending dataset of the work queue to the given worker for 'lease_seconds' seconds.
+    Datasets whose lease expired (e.g. their worker died) are put back in the queue first,
+    or marked as failed after 'max_attempts' leases.
+    Returns a (name, url) tuple, or None if no dataset is left to download.
+    """
+    import time
+
+    now = time.time()
+    with work_queue_transaction(queue_file) as con:
+        con.execute(
+            "UPDATE datasets SET status = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END, "
+            "worker = NULL, lease_expires = NULL, error = 'lease expired', updated = ? "
+            "WHERE status = 'leased' AND lease_expires < ?",
+            (max_attempts, now, now),
+        )
+        row = con.execute(
+            "SELECT name, url FROM datasets WHERE status = 'pending' "
+            "ORDER BY attempts, rowid LIMIT 1"
+        ).fetchone()
+        if row == None:
+            return None
+        con.execute(
+            "UPDATE datasets SET status = 'leased', worker = ?, lease_expires = ?, "
+            "attempts = attempts + 1, updated = ? WHERE name = ?",
+            (worker_id, now + lease_seconds, now, row[0]),
+        )
+
+    return row
+
+
+# ==========================================================================
+# Function to extend the lease of a dataset held by a worker
+# ==========================================================================
+def renew_lease(queue_file, name, worker_id, lease_seconds=600):
+    """
+    Extends the lease of a dataset by 'lease_seconds' seconds from now.
+    Returns False if the worker does not hold the lease anymore (it expired and the dataset was leased again).
+    """
+    import time
+
+    now = time.time()
+    with work_queue_transaction(queue_file) as con:
+        cursor = con.execute(
+            "UPDATE datasets SET lease_expires = ?, updated = ? "
+            "WHERE name = ? AND worker = ? AND status = 'leased'",
+            (now + lease_seconds, now, name, worker_id),
+        )
+
+    return cursor.rowcount == 1
+
+
+# ==========================================================================
+# Function to mark a leased dataset as downloaded (or failed)
+# ==========================================================================
+def complete_dataset(queue_file, name, worker_id, error=None, max_attempts=3):
+    """
+    Releases the lease of a dataset held by a worker, marking the dataset as done.
+    error: Optional error message. The dataset is then put back in the queue, or marked as failed after 'max_attempts' leases.
+    Returns False if the worker did not hold the lease anymore.
+    """
+    import time
+
+    with work_queue_transaction(queue_file) as con:
+        cursor = con.execute(
+            "UPDATE datasets SET status = CASE WHEN ? IS NULL THEN 'done' "
+            "WHEN attempts < ? THEN 'pending' ELSE 'failed' END, "
+            "worker = NULL, lease_expires = NULL, error = ?, updated = ? "
+            "WHERE name = ? AND worker = ? AND status = 'leased'",
+            (error, max_attempts, error, time.time(), name, worker_id),
+        )
+
+    return cursor.rowcount == 1
+
+
+# ==========================================================================
+# Worker function downloading the datasets leased from the work queue
+# ==========================================================================
+def run_download_worker(
+    queue_file="UCI work queue.db",
+    worker_id=None,
+    lease_seconds=600,
+    max_attempts=3,
+    msg_flag=True,
+    download_flag=True,
+    compression=None,
+    extract=False,
+    cache_dir=None,
+    storage=None,
+):
+    """
+    Downloads datasets leased from the shared work queue (see init_work_queue) until all datasets are done or failed.
+    Any number of workers (processes, or nodes sharing the queue file) can run at the same time.
+    While a dataset is downloaded, a heartbeat thread renews its lease, so only the datasets of a dead worker are leased again.
+    queue_file: Name of the work queue (SQLite file).
+    worker_id: Optional name of the worker. By default the host name and process id are used.
+    lease_seconds: Duration of a lease. A dataset is leased again if its worker did not renew the lease in time.
+    max_attempts: Number of leases of a dataset before it is marked as failed.
+    msg_flag: Controls verbosity
+    download_flag: Default is True. If set to False, only creates the directories but does not initiate download (for testing purpose)
+    compression: Optional on-the-fly compression of the downloaded files. Could be None (default), 'gzip', or 'zstd'.
+    extract: Default is False. If set to True, downloaded archives (zip, tar, '.Z') are extracted into the dataset directory.
+    cache_dir: Optional download cache directory shared between processes, so that each file is fetched only once.
+    storage: Optional storage backend (e.g. S3Storage, or LocalStorage on the shared filesystem) receiving the datasets instead of the current directory.
+    Returns the number of datasets processed by this worker.
+    """
+    import os
+    import socket
+    import sqlite3
+    import time
+
+    if worker_id == None:
+        worker_id = f"{socket.gethostname()}-{os.getpid()}"
+
+    def heartbeat(name, stop):
+        while not stop.wait(lease_seconds / 3):
+            try:
+                if not renew_lease(queue_file, name, worker_id, lease_seconds):
+                    print(f"Worker {worker_id} lost the lease of: {name}")
+                    return
+            except sqlite3.Error:
+                # The queue is busy or unreachable: try again at the next beat
+                pass
+
+    processed = 0
+    while True:
+        lease = lease_dataset(
+            queue_file,
+            worker_id,
+            lease_seconds=lease_seconds,
+            max_attempts=max_attempts,
+        )
+        if lease == None:
+            # Datasets leased by other workers may still come back if their worker dies
+            if work_queue_progress(queue_file, msg_flag=False)["leased"] == 0:
+                break
+            time.sleep(min(lease_seconds / 3, 30))
+            continue
+        name, url = lease
+        if msg_flag:
+            print(f"Worker {worker_id} downloading the dataset: {name}")
+
+        stop = threading.Event()
+        beat = threading.Thread(target=heartbeat, args=(name, stop), daemon=True)
+        beat.start()
+        try:
+            failed = download_dataset_url(
+                url,
+                name,
+                download_flag=download_flag,
+                compression=compression,
+                extract=extract,
+                cache_dir=cache_dir,
+                storage=storage,
+            )
+            error = f"{len(failed)} files not downloaded" if failed else None
+        except Exception as e:
+            error = repr(e)
+        finally:
+            stop.set()
+            beat.join()
+
+        if not complete_dataset(
+            queue_file, name, worker_id, error=error, max_attempts=max_attempts
+        ):
+            print(f"Worker {worker_id} lost the lease of: {name}")
+        elif error != None:
+            print(f"Sorry, could not download the dataset {name}: {error}")
+        processed += 1
+
+    if msg_flag:
+        print(f"Worker {worker_id} finished, {processed} datasets processed.")
+
+    return processed
+
+
+# ==========================================================================
+# Function to aggregate the progress of the shared work queue
+# ==========================================================================
+def work_queue_progress(queue_file="UCI work queue.db", msg_flag=True):
+    """
+    Aggregates the progress of the download work queue.
+    Returns a dictionary with the number of datasets per status ('pending', 'leased', 'done', 'failed'), the total,
+    the number of expired leases (datasets of dead workers, not yet leased again) and the number of leases held per worker.
+    msg_flag: Controls verbosity
+    """
+    import time
+
+    with work_queue_transaction(queue_file) as con:
+        rows = con.execute(
+            "SELECT status, COUNT(*) FROM datasets GROUP BY status"
+        ).fetchall()
+        expired = con.execute(
+            "SELECT COUNT(*) FROM datasets WHERE status = 'leased' AND lease_expires < ?",
+            (time.time(),),
+        ).fetchone()[0]
+        workers = con.execute(
+            "SELECT worker, COUNT(*) FROM datasets WHERE status = 'leased' GROUP BY worker"
+        ).fetchall()
+
+    progress = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+    progress.update(dict(rows))
+    progress["total"] = sum(count for status, count in rows)
+    progress["expired"] = expired
+    progress["workers"] = dict(workers)
+
+    if msg_flag:
+        done = progress["done"] + progress["failed"]
+        percent = 100 * done / progress["total"] if progress["total"] > 0 else 100
+        print(
+            f"{done}/{progress['total']} datasets processed ({percent:.1f}%): "
+            f"{progress['done']} done, {progress['failed']} failed, "
+            f"{progress['leased']} in progress ({len(workers)} workers), {progress['pending']} pending"
+        )
+
+    return progress
+
+
+# ==========================================================================
+# User API function to download all datasets with several worker processes
+# ==========================================================================
+def download_datasets_sharded(
+    queue_file="UCI work queue.db",
+    local_database=None,
+    n_workers=4,
+    lease_seconds=600,
+    max_attempts=3,
+    progress_interval=30,
+    msg_flag=True,
+    download_flag=True,
+    compression=None,
+    extract=False,
+    cache_dir=None,
+    storage=None,
+):
+    """
+    Coordinator downloading all the datasets of the catalog, sharded between worker processes through a durable work queue.
+    The catalog is loaded into the queue (see init_work_queue), 'n_workers' local worker processes are started
+    and the progress of the queue is reported until all datasets are processed.
+    To spread a mirror over several nodes, put the queue file on a shared filesystem and run run_download_worker
+    (or this function) on the other nodes with the same queue file. Note that SQLite locking needs a filesystem with
+    working file locks, and the clocks of the nodes must be roughly in sync for the leases to expire correctly.
+    queue_file: Name of the work queue (SQLite file).
+    local_database: Name of the database (CSV file) stored locally i.e. in the same directory, which contains information about all the datasets on UCI ML repo.
+    n_workers: Number of local worker processes. With 0, the function only loads the queue and reports the progress of remote workers.
+    lease_seconds: Duration of a lease. A dataset is leased again if its worker did not renew the lease in time.
+    max_attempts: Number of leases of a dataset before it is marked as failed.
+    progress_interval: Seconds between two progress reports.
+    msg_flag: Controls verbosity
+    download_flag: Default is True. If set to False, only creates the directories but does not initiate download (for testing purpose)
+    compression: Optional on-the-fly compression of the downloaded files. Could be None (default), 'gzip', or 'zstd'.
+    extract: Default is False. If set to True, downloaded archives (zip, tar, '.Z') are extracted into the dataset directory.
+    cache_dir: Optional download cache directory shared between processes, so that each file is fetched only once.
+    storage: Optional storage backend (e.g. S3Storage) receiving the datasets instead of the current directory.
+    Returns the final progress (see work_queue_progress).
+    """
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_EXCEPTION
+
+    init_work_queue(queue_file, local_database=local_database, msg_flag=msg_flag)
+
+    if n_workers > 0:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = [
+                executor.submit(
+                    run_download_worker,
+                    queue_file,
+                    lease_seconds=lease_seconds,
+                    max_attempts=max_attempts,
+                    msg_flag=msg_flag,
+                    download_flag=download_flag,
+                    compression=compression,
+                    extract=extract,
+                    cache_dir=cache_dir,
+                    storage=storage,
+                )
+                for i in range(n_workers)
+            ]
+            while True:
+                done, running = wait(
+                    futures, timeout=progress_interval, return_when=FIRST_EXCEPTION
+                )
+                if len(running) == 0:
+                    break
+                if any(f.exception() != None for f in done):
+                    break
+                if msg_flag:
+                    work_queue_progress(queue_file)
+            for f in done:
+                if f.exception() != None:
+                    print(f"Sorry, a download worker failed: {f.exception()!r}")
+    else:
+        # Remote workers only: wait until nothing is pending or in progress
+        import time
+
+        while True:
+            progress = work_queue_progress(queue_file, msg_flag=msg_flag)
+            if progress["pending"] + progress["leased"] == 0:
+                break
+            time.sleep(progress_interval)
+
+    return work_queue_progress(queue_file, msg_flag=msg_flag)
+
+
+# ==========================================================================
+# Function to look up the exact name of a dataset in the catalog by searching
+# ==========================================================================
+def lookup_dataset_name(name, local_database=None, msg_flag=True):
+    """
+    Returns the exact name of a dataset in the catalog by searching the given name, or None if not found.
+    An exact match of the name is preferred, otherwise the first partial match is used.
+    local_database: Name of the database (CSV file) stored locally i.e. in the same directory, which contains information about all the datasets on UCI ML repo.
+    msg_flag: Controls verbosity
+    """
+    import pandas as pd
+
+    if local_database != None:
+        df = pd.read_csv(local_database, index_col="Dataset")
+    else:
+        df = cached_catalog("database", msg_flag=msg_flag)
+        if df is None:
+            return None
+
+    names = list(df["Name"])
+    if name in names:
+        return name
+
+    matches = [n for n in names if name in n]
+    if len(matches) == 0:
+        print(f'Search term "{name}" not found in the database.')
+        return None
+    if msg_flag and len(matches) > 1:
+        print(
+            f"{len(matches)} instances of search term found including partial match. Using: {matches[0]}"
+        )
+
+    return matches[0]
+
+
+# =================================================================
+# Function to list the raw data files in a local dataset directory
+# =================================================================
+def list_data_files(local_directory):
+    """
+    Lists the raw data files (e.g. '.data', '.csv', optionally compressed) in a local dataset directory and its subdirectories.
+    Hidden directories (such as the caches written by this module) are skipped.
+    Returns a list of file names sorted by size (largest first).
+    """
+    import os
+
+    data_files = []
+    for root, dirs, files in os.walk(local_directory):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for f in files:
+            base = f
+            for ext in [".gz", ".zst"]:
+                if base.endswith(ext):
+                    base = base[: -len(ext)]
+            if base.lower().endswith(DATA_EXTENSIONS):
+                data_files.append(os.path.join(root, f))
+
+    return sorted(data_files, key=os.path.getsize, reverse=True)
+
+
+# ======================================================================
+# Function to find the downloaded data files of a dataset in the catalog
+# ======================================================================
+def find_dataset_files(name, local_database=None, msg_flag=True):
+    """
+    Finds the downloaded raw data files (e.g. '.data', '.csv', optionally compressed) of a dataset by searching the given name in the catalog.
+    local_database: Name of the database (CSV file) stored locally i.e. in the same directory, which contains information about all the datasets on UCI ML repo.
+    msg_flag: Controls verbosity
+    Returns a list of file names sorted by size (largest first), or None if the dataset could not be found.
+    """
+    import os
+
+    dataset_name = lookup_dataset_name(
+        name, local_database=local_database, msg_flag=msg_flag
     )
+    if dataset_name == None:
+        return None
+
+    local_directory = dataset_directory(dataset_name)
+    if not os.path.isdir(local_directory):
+        print(f"Dataset {dataset_name} has not been downloaded yet.")
+        return None
+
+    return list_data_files(local_directory)
+
+
+# ==================================================================================
+# Function to select one downloaded data file of a dataset (largest one by default)
+# ==================================================================================
+def select_data_file(name, filename=None, local_database=None, msg_flag=True):
+    """
+    Returns the downloaded raw data file of a dataset by searching the given name in the catalog, or None if not found.
+    filename: Optional name of the file (inside the dataset directory). By default the largest raw data file is returned.
+    local_database: Name of the database (CSV file) stored locally i.e. in the same directory, which contains information about all the datasets on UCI ML repo.
+    msg_flag: Controls verbosity
+    """
+    import os
+
+    data_files = find_dataset_files(
+        name, local_database=local_database, msg_flag=msg_flag
+    )
+    if data_files == None:
+        return None
+    if len(data_files) == 0:
+        print(f"No raw data file found for: {name}")
+        return None
+
+    if filename != None:
+        matches = [f for f in data_files if os.path.basename(f) == filename]
+        if len(matches) == 0:
+            print(f"{filename} is not a raw data file of the dataset {name}")
+            return None
+        return matches[0]
+    else:
+        return data_files[0]
+
+
+# =============================================================================
+# Helper function returning the signature of a file for cache invalidation
+# =============================================================================
+def data_file_signature(filename, validate="mtime"):
+    """
+    Returns a dictionary identifying the current contents of a file, used to invalidate derived (cached) copies of it.
+    validate: Could be 'mtime' (default, file size and modification time) or 'hash' (SHA-256 of the file contents).
+    """
+    import os
+    import hashlib
+
+    assert validate in ["mtime", "hash"]
+
+    if validate == "hash":
+        h = hashlib.sha256()
+        with open(filename, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(block)
+        return {"sha256": h.hexdigest()}
+    else:
+        stat = os.stat(filename)
+        return {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+
+# ====================================================================
+# Function to read a raw data file as a sequence of DataFrame chunks
+# ====================================================================
+def iter_data_file_chunks(filename, chunk_size=100000):
+    """
+    Generator reading a raw (possibly compressed) data file in chunks of rows, yielding one DataFrame per chunk.
+    The delimiter and the presence of a header row are inferred from the beginning of the file, and '?' is treated as a missing value (as commonly used on UCI ML repo).
+    chunk_size: Number of rows read at a time.
+    """
+    import pandas as pd
+    import csv
+
+    with open_compressed_file(filename, "rb") as f:
+        sample = f.read(64 * 1024).decode("utf-8", errors="replace")
+    sample = "\n".join(sample.splitlines()[:-1]) or sample
+
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t| ")
+        sep = dialect.delimiter
+    except csv.Error:
+        sep = ","
+    if sep == " ":
+        sep = r"\s+"
+    try:
+        header = 0 if csv.Sniffer().has_header(sample) else None
+    except csv.Error:
+        header = None
+
+    with open_compressed_file(filename, "rb") as f:
+        reader = pd.read_csv(
+            f,
+            sep=sep,
+            header=header,
+            na_values=["?"],
+            skipinitialspace=True,
+            chunksize=chunk_size,
+        )
+        for chunk in reader:
+            yield chunk
+
+
+# ====================================================================
+# Function to parse a raw data file into a DataFrame in chunks
+# ====================================================================
+def parse_data_file(filename, chunk_size=100000):
+    """
+    Parses a raw (possibly compressed) data file into a DataFrame, reading it in chunks.
+    Integer columns are downcast and low-cardinality text columns are converted to categoricals.
+    The dtypes inferred for each chunk are reconciled: a column which is text in any chunk is text (strings) in all of them.
+    chunk_size: Number of rows read at a time.
+    """
+    import pandas as pd
+
+    chunks = list(iter_data_file_chunks(filename, chunk_size=chunk_size))
+    if len(chunks) == 0:
+        return pd.DataFrame()
+
+    # Columns parsed as numbers in some chunks and as text in others would otherwise mix numbers and strings
+    text_columns = set()
+    for chunk in chunks:
+        for col in chunk.columns:
+            if pd.api.types.is_object_dtype(chunk[col]) or pd.api.types.is_string_dtype(
+                chunk[col]
+            ):
+                text_columns.add(col)
+    for chunk in chunks:
+        for col in text_columns:
+            if col in chunk.columns:
+                values = chunk[col].astype(object)
+                chunk[col] = values.where(values.isna(), values.astype(str))
+    df = pd.concat(chunks, ignore_index=True)
+
+    for col in df.columns:
+        if pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+        elif pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(
+            df[col]
+        ):
+            if df[col].nunique() <= 0.5 * len(df[col]):
+                df[col] = df[col].astype("category")
+
+    return df
+
+
+# ====================================================================================
+# User API function to load a downloaded dataset, with a cached binary conversion
+# ====================================================================================
+def load_dataset(
+    name,
+    filename=None,
+    local_database=None,
+    chunk_size=100000,
+    cache=True,
+    validate="mtime",
+    msg_flag=True,
+):
+    """
+    Loads a downloaded dataset into a DataFrame by searching the given name in the catalog.
+    The raw text file is parsed only once and cached as a binary columnar (Parquet) file next to it, so later loads skip the text parsing entirely.
+    filename: Optional name of the file (inside the dataset directory) to load. By default the largest raw data file is loaded.
+    local_database: Name of the database (CSV file) stored locally i.e. in the same directory, which contains information about all the datasets on UCI ML repo.
+    chunk_size: Number of rows read at a time while parsing the raw file.
+    cache: Default is True. If set to False, always parses the raw file and does not write the cache.
+    validate: How the cache is checked against the raw file. Could be 'mtime' (default, file size and modification time) or 'hash' (SHA-256 of the file contents).
+    msg_flag: Controls verbosity
+    """
+    import pandas as pd
+    import os
+    import json
+
+    source = select_data_file(
+        name, filename=filename, local_database=local_database, msg_flag=msg_flag
+    )
+    if source == None:
+        return None
+    source_info = data_file_signature(source, validate=validate)
+
+    cache_directory = os.path.join(os.path.dirname(source), ".uciml_cache")
+    cache_file = os.path.join(cache_directory, os.path.basename(source) + ".parquet")
+    meta_file = cache_file + ".json"
+
+    meta = None
+    if cache and os.path.exists(cache_file) and os.path.exists(meta_file):
+        # An unreadable sidecar (e.g. from an older, interrupted write) is a cache miss
+        try:
+            with open(meta_file) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = None
+    if meta != None and meta.get("source") == source_info:
+        if msg_flag:
+            print(f"Loading cached binary copy of {os.path.basename(source)}")
+        df = pd.read_parquet(cache_file)
+        if meta["integer_columns"]:
+            df.columns = [int(c) for c in df.columns]
+        return df
+
+    if msg_flag:
+        print(f"Parsing {os.path.basename(source)}...")
+    df = parse_data_file(source, chunk_size=chunk_size)
+
+    if cache:
+        integer_columns = not all(isinstance(c, str) for c in df.columns)
+        df_cache = df.copy(deep=False)
+        df_cache.columns = [str(c) for c in df.columns]
+        try:
+            if not os.path.exists(cache_directory):
+                os.makedirs(cache_directory)
+            # Both files are written atomically, as concurrent runs may cache the same file
+            with atomic_open(cache_file) as f:
+                df_cache.to_parquet(f)
+            meta = {"source": source_info, "integer_columns": integer_columns}
+            with atomic_open(meta_file) as f:
+                f.write(json.dumps(meta).encode("utf-8"))
+        except ImportError:
+            print(
+                "Could not write the binary cache. Please install 'pyarrow' (or 'fastparquet') to enable caching."
+            )
+        except:
+            print(f"Sorry, could not write the binary cache for {source}")
+
+    return df
+
+
+# =====================================================================================
+# User API function to export a numeric dataset into memory-mappable NumPy arrays
+# =====================================================================================
+def export_memmap_dataset(
+    name,
+    filename=None,
+    local_database=None,
+    out_directory=None,
+    chunk_size=100000,
+    msg_flag=True,
+):
+    """
+    Converts a downloaded dataset into on-disk NumPy arrays ('.npy', one per numeric column) with a 'memmap.json' sidecar holding column names and dtypes.
+    The conversion is done in chunks (two passes over the raw file), so datasets larger than the memory can be exported.
+    The arrays can then be opened with open_memmap_dataset and shared by many processes through the page cache.
+    Re-exporting a changed file writes a new version of the arrays and then switches the sidecar to it (atomically),
+    so processes which have the old arrays open keep reading them unchanged.
+    Non-numeric columns are skipped.
+    filename: Optional name of the file (inside the dataset directory) to export. By default the largest raw data file is exported.
+    local_database: Name of the database (CSV file) stored locally i.e. in the same directory, which contains information about all the datasets on UCI ML repo.
+    out_directory: Optional directory for the arrays. By default a '.uciml_memmap' folder next to the raw file is used.
+    chunk_size: Number of rows read at a time.
+    msg_flag: Controls verbosity
+    Returns the directory holding the arrays, or None if the dataset could not be exported.
+    """
+    import numpy as np
+    import pandas as pd
+    import os
+    import json
+    import uuid
+
+    source = select_data_file(
+        name, filename=filename, local_database=local_database, msg_flag=msg_flag
+    )
+    if source == None:
+        return None
+    source_info = data_file_signature(source)
+
+    if out_directory == None:
+        out_directory = os.path.join(
+            os.path.dirname(source), ".uciml_memmap", os.path.basename(source)
+        )
+    meta_file = os.path.join(out_directory, "memmap.json")
+
+    try:
+        with open(meta_file) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = None
+    if meta != None and meta.get("source") == source_info:
+        if msg_flag:
+            print(f"Arrays for {os.path.basename(source)} are up to date.")
+        return out_directory
+
+    # First pass: number of rows and a common dtype for every column
+    nrows = 0
+    dtypes = {}
+    columns = []
+    for chunk in iter_data_file_chunks(source, chunk_size=chunk_size):
+        if nrows == 0:
+            columns = list(chunk.columns)
+        nrows += chunk.shape[0]
+        for col in columns:
+            if col in dtypes and dtypes[col] is None:
+                continue
+            if pd.api.types.is_numeric_dtype(chunk[col]):
+                dtype = np.dtype(chunk[col].dtype)
+                if col in dtypes:
+                    dtype = np.result_type(dtypes[col], dtype)
+                dtypes[col] = dtype
+            else:
+                dtypes[col] = None
+
+    # NOTE np.dtype(None) is float64, hence the identity checks
+    numeric_columns = [col for col in columns if dtypes[col] is not None]
+    skipped = [col for col in columns if dtypes[col] is None]
+    if len(numeric_columns) == 0:
+        print(f"No numeric column found in {os.path.basename(source)}")
+        return None
+    if msg_flag:
+        print(
+            f"Exporting {nrows} rows and {len(numeric_columns)} numeric columns of {os.path.basename(source)}..."
+        )
+        if len(skipped) > 0:
+            print(f"Skipping non-numeric columns: {skipped}")
+
+    if not os.path.exists(out_directory):
+        os.makedirs(out_directory)
+
+    # Second pass: fill the pre-allocated arrays chunk by chunk.
+    # The arrays of every export get new file names, so the arrays of a previous export (possibly memory-mapped
+    # by other processes) are never overwritten. They are only unlinked once the sidecar points to the new ones.
+    version = uuid.uuid4().hex[:12]
+    files = {col: f"col_{i:04d}-{version}.npy" for i, col in enumerate(numeric_columns)}
+    arrays = {}
+    for col in numeric_columns:
+        arrays[col] = np.lib.format.open_memmap(
+            os.path.join(out_directory, files[col]),
+            mode="w+",
+            dtype=dtypes[col],
+            shape=(nrows,),
+        )
+    start = 0
+    for chunk in iter_data_file_chunks(source, chunk_size=chunk_size):
+        stop = start + chunk.shape[0]
+        for col in numeric_columns:
+            arrays[col][start:stop] = chunk[col].to_numpy(dtype=dtypes[col])
+        start = stop
+    for col in numeric_columns:
+        arrays[col].flush()
+    del arrays
+
+    meta = {
+        "source": source_info,
+        "nrows": nrows,
+        "columns": [
+            {"name": col, "dtype": dtypes[col].str, "file": files[col]}
+            for col in numeric_columns
+        ],
+        "skipped": skipped,
+    }
+    with atomic_open(meta_file) as f:
+        f.write(json.dumps(meta).encode("utf-8"))
+
+    # Arrays of previous (or interrupted) exports. Processes which mapped them keep their mapping.
+    for f in os.listdir(out_directory):
+        if f.startswith("col_") and f.endswith(".npy") and f not in files.values():
+            try:
+                os.remove(os.path.join(out_directory, f))
+            except OSError:
+                pass
+
+    return out_directory
+
+
+# ==================================================================
+# Function to open an exported dataset as memory-mapped NumPy arrays
+# ==================================================================
+def open_memmap_dataset(directory, mode="r"):
+    """
+    Opens the arrays written by export_memmap_dataset without loading them into memory.
+    Returns a dictionary of column name to (memory-mapped) NumPy array. Slicing these arrays does not copy the data.
+    mode: Memory-map mode passed on to numpy.load. Default is 'r' (read-only); 'c' gives private copy-on-write arrays.
+    The arrays stay valid (with the old contents) if the dataset is exported again while they are open.
+    """
+    import numpy as np
+    import os
+    import json
+
+    for attempt in range(3):
+        with open(os.path.join(directory, "memmap.json")) as f:
+            meta = json.load(f)
+        try:
+            arrays = {}
+            for col in meta["columns"]:
+                arrays[col["name"]] = np.load(
+                    os.path.join(directory, col["file"]), mmap_mode=mode
+                )
+            return arrays
+        except FileNotFoundError:
+            # A new export replaced these arrays while they were being opened: read the new sidecar
+            if attempt == 2:
+                raise
+
+
+# =====================================================================
+# Function to profile one chunk of a data file with mergeable sketches
+# =====================================================================
+def profile_chunk(chunk, sample_size=1024, seed=None):
+    """
+    Computes per-column statistics of one DataFrame chunk, in a form which can be merged with merge_profiles.
+    Besides counts, missing values, min/max/mean and the sum of squared deviations, each column keeps two small sketches:
+    the smallest hashes of its values (for approximate distinct counts) and a random sample of numeric values (for approximate quantiles).
+    sample_size: Size of both sketches. Larger sketches are more accurate but use more memory.
+    seed: Seed of the random sample. Different chunks should use different seeds.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    profile = {"rows": chunk.shape[0], "sample_size": sample_size, "columns": {}}
+
+    for col in chunk.columns:
+        series = chunk[col].dropna()
+        stats = {
+            "count": series.shape[0],
+            "missing": chunk.shape[0] - series.shape[0],
+            "numeric": pd.api.types.is_numeric_dtype(chunk[col]),
+        }
+
+        if stats["numeric"]:
+            # Numeric values are hashed as float64, whatever the dtype of the chunk: an integer column is parsed
+            # as float in the chunks with missing values, and 85 and 85.0 must count as the same value.
+            # (Adding 0.0 turns -0.0 into 0.0.)
+            values = series.to_numpy(dtype="float64") + 0.0
+            hashes = np.unique(pd.util.hash_array(values))
+        else:
+            hashes = np.unique(
+                pd.util.hash_array(np.asarray(series.astype(str), dtype=object))
+            )
+        stats["hashes"] = hashes[:sample_size]
+
+        if stats["numeric"] and stats["count"] > 0:
+            stats["min"] = values.min()
+            stats["max"] = values.max()
+            stats["mean"] = values.mean()
+            stats["m2"] = ((values - stats["mean"]) ** 2).sum()
+            priorities = rng.random(values.shape[0])
+            keep = np.argsort(priorities)[:sample_size]
+            stats["sample"] = (priorities[keep], values[keep])
+
+        profile["columns"][col] = stats
+
+    return profile
+
+
+# =================================================================
+# Function to merge the profiles of two chunks of the same file
+# =================================================================
+def merge_profiles(a, b, sample_size=1024):
+    """
+    Merges two profiles returned by profile_chunk (or by previous merges) into one, as if both chunks had been profiled together.
+    The order of merging does not matter, so chunks can be profiled in parallel. The first profile can be None (empty profile).
+    sample_size: Size of the sketches kept after merging.
+    """
+    import numpy as np
+
+    if a == None:
+        return b
+
+    merged = {"rows": a["rows"] + b["rows"], "sample_size": sample_size, "columns": {}}
+
+    columns = list(a["columns"]) + [c for c in b["columns"] if c not in a["columns"]]
+    for col in columns:
+        if col not in b["columns"]:
+            merged["columns"][col] = a["columns"][col]
+            continue
+        if col not in a["columns"]:
+            merged["columns"][col] = b["columns"][col]
+            continue
+        x = a["columns"][col]
+        y = b["columns"][col]
+        stats = {
+            "count": x["count"] + y["count"],
+            "missing": x["missing"] + y["missing"],
+            "numeric": x["numeric"] and y["numeric"],
+            "hashes": np.union1d(x["hashes"], y["hashes"])[:sample_size],
+        }
+
+        if stats["numeric"]:
+            if "mean" not in x:
+                x, y = y, x
+            if "mean" in y:
+                # Parallel update of mean and variance (Chan et al.)
+                nx = x["count"]
+                ny = y["count"]
+                delta = y["mean"] - x["mean"]
+                stats["min"] = min(x["min"], y["min"])
+                stats["max"] = max(x["max"], y["max"])
+                stats["mean"] = x["mean"] + delta * ny / (nx + ny)
+                stats["m2"] = x["m2"] + y["m2"] + delta**2 * nx * ny / (nx + ny)
+                priorities = np.concatenate([x["sample"][0], y["sample"][0]])
+                values = np.concatenate([x["sample"][1], y["sample"][1]])
+                keep = np.argsort(priorities)[:sample_size]
+                stats["sample"] = (priorities[keep], values[keep])
+            elif "mean" in x:
+                for key in ["min", "max", "mean", "m2", "sample"]:
+                    stats[key] = x[key]
+
+        merged["columns"][col] = stats
+
+    return merged
+
+
+# ===================================================================
+# Function to turn a (merged) profile into the final column statistics
+# ===================================================================
+def finalize_profile(profile, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+    """
+    Turns a profile returned by profile_chunk/merge_profiles into a DataFrame with one row of statistics per column.
+    quantiles: Approximate quantiles computed from the random sample of numeric columns.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rows = []
+    for col, stats in profile["columns"].items():
+        hashes = stats["hashes"]
+        k = hashes.shape[0]
+        if k < profile["sample_size"]:
+            # The sketch is not full, so it holds every distinct value
+            distinct = k
+        else:
+            # K-minimum values estimate of the number of distinct values
+            distinct = int(round((k - 1) / (float(hashes[-1]) / 2.0**64)))
+        row = {
+            "Column": col,
+            "Count": stats["count"],
+            "Missing": stats["missing"],
+            "Distinct (approx.)": distinct,
+        }
+        if "mean" in stats:
+            row["Min"] = stats["min"]
+            row["Max"] = stats["max"]
+            row["Mean"] = stats["mean"]
+            row["Variance"] = (
+                stats["m2"] / (stats["count"] - 1) if stats["count"] > 1 else 0.0
+            )
+            values = stats["sample"][1]
+            for q in quantiles:
+                row[f"Quantile {q}"] = np.quantile(values, q)
+        rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+# ===========================================================================
+# Function to profile a data file in a single streaming pass (in parallel)
+# ===========================================================================
+def profile_data_file(filename, chunk_size=100000, sample_size=1024, n_jobs=1):
+    """
+    Profiles a raw (possibly compressed) data file in a single pass with bounded memory, reading it in chunks.
+    Returns a DataFrame with one row of statistics per column (counts, missing values, min/max/mean/variance, approximate distinct count and quantiles).
+    chunk_size: Number of rows read at a time.
+    sample_size: Size of the sketches used for approximate distinct counts and quantiles.
+    n_jobs: Number of worker processes profiling chunks in parallel. Default is 1 (no worker processes).
+    """
+    from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+    chunks = iter_data_file_chunks(filename, chunk_size=chunk_size)
+    profile = None
+
+    if n_jobs <= 1:
+        for i, chunk in enumerate(chunks):
+            p = profile_chunk(chunk, sample_size=sample_size, seed=i)
+            profile = merge_profiles(profile, p, sample_size)
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            pending = set()
+            for i, chunk in enumerate(chunks):
+                pending.add(executor.submit(profile_chunk, chunk, sample_size, i))
+                # Bound the number of chunks held in memory at any time
+                if len(pending) >= 2 * n_jobs:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        profile = merge_profiles(profile, future.result(), sample_size)
+            for future in pending:
+                profile = merge_profiles(profile, future.result(), sample_size)
+
+    if profile == None:
+        return None
+
+    return finalize_profile(profile)
+
+
+# ==============================================================================
+# User API function to profile a downloaded dataset and store it with the catalog
+# ==============================================================================
+def profile_dataset(
+    name,
+    local_database=None,
+    local_profile="UCI profile.csv",
+    chunk_size=100000,
+    sample_size=1024,
+    n_jobs=1,
+    msg_flag=True,
+):
+    """
+    Profiles all the raw data files of a downloaded dataset in a streaming fashion, without loading them fully into memory.
+    The per-column statistics are stored (one row per dataset, file and column) in a local CSV file next to the catalog, replacing older rows of the same dataset.
+    The profile has a 'Name' column and can be merged with the local database/table like they are merged with each other.
+    local_database: Name of the database (CSV file) stored locally i.e. in the same directory, which contains information about all the datasets on UCI ML repo.
+    local_profile: Name of the CSV file storing the profiles. If None, the profile is only returned.
+    chunk_size: Number of rows read at a time.
+    sample_size: Size of the sketches used for approximate distinct counts and quantiles.
+    n_jobs: Number of worker processes profiling chunks in parallel.
+    msg_flag: Controls verbosity
+    """
+    import pandas as pd
+    import os
+
+    dataset_name = lookup_dataset_name(
+        name, local_database=local_database, msg_flag=msg_flag
+    )
+    if dataset_name == None:
+        return None
+    local_directory = dataset_directory(dataset_name)
+    if not os.path.isdir(local_directory):
+        print(f"Dataset {dataset_name} has not been downloaded yet.")
+        return None
+    data_files = list_data_files(local_directory)
+
+    profiles = []
+    for filename in data_files:
+        if msg_flag:
+            print(f"Profiling {os.path.basename(filename)}...")
+        try:
+            df = profile_data_file(
+                filename, chunk_size=chunk_size, sample_size=sample_size, n_jobs=n_jobs
+            )
+        except:
+            print(f"Sorry, could not profile {os.path.basename(filename)}")
+            continue
+        if df is None:
+            continue
+        df.insert(0, "File", os.path.relpath(filename, local_directory))
+        profiles.append(df)
+
+    if len(profiles) == 0:
+        print(f"No raw data file could be profiled for: {dataset_name}")
+        return None
+
+    df_profile = pd.concat(profiles, ignore_index=True)
+    df_profile.insert(0, "Name", dataset_name)
+
+    if local_profile != None:
+        if os.path.exists(local_profile):
+            df_old = pd.read_csv(local_profile)
+            df_old = df_old[df_old["Name"] != dataset_name]
+            df_all = pd.concat([df_old, df_profile], ignore_index=True)
+        else:
+            df_all = df_profile
+        try:
+            df_all.to_csv(local_profile, index=False)
+        except:
+            print(
+                "Sorry, could not create the CSV table. Please make sure to close an already opened file, \
+            or to have sufficient permission to write files in the current directory"
+            )
+
+    return df_profile
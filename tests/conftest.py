@@ -0,0 +1,51 @@
+import collections
+import http.server
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class CountingHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    Serves the files of the server directory, counting the GET requests per path.
+    Files are sent slowly, so that concurrent clients really overlap.
+    """
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.counts[self.path] += 1
+        if not self.path.endswith("/"):
+            time.sleep(self.server.delay)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_server(tmp_path):
+    """
+    Local HTTP server over a temporary directory. Yields (base url, served directory, GET counts per path).
+    """
+    root = tmp_path / "server"
+    root.mkdir()
+
+    def handler(*args, **kwargs):
+        return CountingHandler(*args, directory=str(root), **kwargs)
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.counts = collections.Counter()
+    server.lock = threading.Lock()
+    server.delay = 0.2
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", root, server.counts
+    finally:
+        server.shutdown()
+        server.server_close()
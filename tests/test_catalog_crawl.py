@@ -0,0 +1,39 @@
+import os
+import urllib.error
+
+import pandas as pd
+
+import UCI_ML_Functions as uci
+
+
+def test_transient_failures_are_retried(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        uci,
+        "iter_dataset_dictionary",
+        lambda msg_flag=True: iter([("A", "a", "ida"), ("B", "b", "idb")]),
+    )
+    down = {"idb"}
+    fetched = []
+
+    def extract_url_dataset(identifier, msg_flag=False, raise_errors=False):
+        fetched.append(identifier)
+        if identifier in down and raise_errors:
+            raise urllib.error.URLError("network is down")
+        return "http://localhost/" + identifier
+
+    monkeypatch.setattr(uci, "extract_url_dataset", extract_url_dataset)
+
+    uci.build_local_database("db.csv", msg_flag=False)
+    df = pd.read_csv("db.csv", index_col="Dataset")
+    assert list(df["Datapage URL"]) == ["http://localhost/ida", "URL not available"]
+    # The page which failed is not checkpointed, and the checkpoint is kept
+    assert list(uci.read_crawl_checkpoint("db.csv.checkpoint.jsonl")) == ["A"]
+
+    down.clear()
+    fetched.clear()
+    uci.build_local_database("db.csv", msg_flag=False)
+    df = pd.read_csv("db.csv", index_col="Dataset")
+    assert list(df["Datapage URL"]) == ["http://localhost/ida", "http://localhost/idb"]
+    assert fetched == ["idb"]
+    assert not os.path.exists("db.csv.checkpoint.jsonl")
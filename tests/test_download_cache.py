@@ -0,0 +1,70 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import UCI_ML_Functions as uci
+
+N_PROCESSES = 6
+
+
+def download_all(urls, directory, cache_dir):
+    return [uci.download_file(url, directory, cache_dir=cache_dir) for url in urls]
+
+
+def test_shared_cache_fetches_each_url_once(http_server, tmp_path):
+    base_url, root, counts = http_server
+    contents = {
+        "a.data": os.urandom(3 * 1024 * 1024),
+        "b.csv": b"1,2,3\n" * 10000,
+        "c.names": b"names\n",
+    }
+    for name, data in contents.items():
+        (root / name).write_bytes(data)
+    urls = [f"{base_url}/{name}" for name in contents]
+    cache_dir = str(tmp_path / "cache")
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(N_PROCESSES, mp_context=context) as executor:
+        futures = [
+            executor.submit(download_all, urls, str(tmp_path / f"out{i}"), cache_dir)
+            for i in range(N_PROCESSES)
+        ]
+        results = [future.result() for future in futures]
+
+    for name in contents:
+        assert counts["/" + name] == 1
+    for i, filenames in enumerate(results):
+        assert filenames == [str(tmp_path / f"out{i}" / name) for name in contents]
+        for filename, data in zip(filenames, contents.values()):
+            with open(filename, "rb") as f:
+                assert f.read() == data
+
+
+def test_lock_files_stay_hidden_next_to_the_data(tmp_path):
+    storage = uci.LocalStorage(str(tmp_path))
+    with storage.open_write("Dataset/a.data") as f:
+        f.write(b"1,2\n")
+    with storage.lock("Dataset/" + uci.EXTRACTION_MANIFEST):
+        pass
+
+    assert os.path.isfile(
+        tmp_path / "Dataset" / ".uciml_locks" / (uci.EXTRACTION_MANIFEST + ".lock")
+    )
+    assert storage.list_keys("Dataset") == ["Dataset/a.data"]
+
+
+def test_atomic_open_gives_the_usual_file_mode(tmp_path):
+    filename = str(tmp_path / "a.data")
+    umask = os.umask(0o027)
+    try:
+        with uci.atomic_open(filename) as f:
+            f.write(b"1")
+        assert os.stat(filename).st_mode & 0o777 == 0o640
+        # An existing file keeps its mode
+        os.chmod(filename, 0o604)
+        with uci.atomic_open(filename) as f:
+            f.write(b"2")
+        assert os.stat(filename).st_mode & 0o777 == 0o604
+    finally:
+        os.umask(umask)
+    assert os.listdir(tmp_path) == ["a.data"]
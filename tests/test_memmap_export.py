@@ -0,0 +1,66 @@
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+
+import UCI_ML_Functions as uci
+
+
+def write_dataset(directory, nrows, offset):
+    df = pd.DataFrame(
+        {"a": np.arange(nrows) + offset, "b": np.arange(nrows) * 0.5 + offset}
+    )
+    df.to_csv(directory / "values.data", index=False)
+    return df
+
+
+def read_old_arrays(directory, ready, go, results):
+    arrays = uci.open_memmap_dataset(directory)
+    ready.set()
+    go.wait()
+    results.put({name: float(array.sum()) for name, array in arrays.items()})
+
+
+def test_reexport_keeps_open_mappings_valid(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    database = tmp_path / "UCI database.csv"
+    pd.DataFrame(
+        {"Dataset": ["Values"], "Name": ["Values"], "Datapage URL": ["-"]}
+    ).to_csv(database, index=False)
+    (tmp_path / "Values").mkdir()
+    old = write_dataset(tmp_path / "Values", 300000, 0)
+    directory = uci.export_memmap_dataset(
+        "Values", local_database=str(database), chunk_size=50000, msg_flag=False
+    )
+    old_files = set(os.listdir(directory))
+
+    context = multiprocessing.get_context("spawn")
+    ready, go, results = context.Event(), context.Event(), context.Queue()
+    reader = context.Process(
+        target=read_old_arrays, args=(directory, ready, go, results)
+    )
+    reader.start()
+    try:
+        assert ready.wait(60)
+        # The raw file changes (and shrinks) while the reader has the arrays mapped
+        new = write_dataset(tmp_path / "Values", 1000, 7)
+        assert (
+            uci.export_memmap_dataset(
+                "Values", local_database=str(database), chunk_size=50000, msg_flag=False
+            )
+            == directory
+        )
+        go.set()
+        sums = results.get(timeout=60)
+    finally:
+        reader.join(60)
+    assert reader.exitcode == 0
+    assert sums == {col: float(old[col].sum()) for col in old.columns}
+
+    arrays = uci.open_memmap_dataset(directory)
+    for col in new.columns:
+        assert np.array_equal(arrays[col], new[col].to_numpy())
+    # Only the arrays of the new export are left
+    assert set(os.listdir(directory)) & old_files == {"memmap.json"}
+    assert len(os.listdir(directory)) == 3
@@ -0,0 +1,19 @@
+import pandas as pd
+import pytest
+
+import UCI_ML_Functions as uci
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_distinct_counts_across_chunk_dtypes(tmp_path, n_jobs):
+    rows = [f"{i % 100},{i % 7},x{i % 3}" for i in range(5000)]
+    # A missing value in a later chunk: that chunk parses the first column as float
+    rows[4500] = "?,1,x1"
+    filename = tmp_path / "values.data"
+    filename.write_text("\n".join(rows) + "\n")
+
+    profile = uci.profile_data_file(str(filename), chunk_size=1000, n_jobs=n_jobs)
+
+    assert list(profile["Distinct (approx.)"]) == [100, 7, 3]
+    assert list(profile["Missing"]) == [1, 0, 0]
+    assert profile["Min"][0] == 0 and profile["Max"][0] == 99
@@ -0,0 +1,99 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+import UCI_ML_Functions as uci
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+MB = 1024 * 1024
+# Output of unix 'compress' for Z_CONTENTS
+Z_FILE = bytes.fromhex(
+    "1f9d90549e0829f2448a932754020e2ca890a04184231a163c9850a043890fa944b4381121468c144700"
+)
+Z_CONTENTS = b"TOBEORNOTTOBEORTOBEORNOT#" * 3
+
+
+@pytest.fixture
+def storage():
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="uci")
+        yield uci.S3Storage(
+            "uci", prefix="mirror", part_size=5 * MB, region_name="us-east-1"
+        )
+
+
+def test_multipart_round_trip(storage):
+    data = os.urandom(12 * MB + 123)
+    with storage.open_write("Big/big.data") as f:
+        # Writes not aligned with the parts
+        for start in range(0, len(data), 3 * MB + 7):
+            f.write(data[start : start + 3 * MB + 7])
+        assert len(f.buffer) < storage.part_size
+
+    assert storage.list_keys("Big") == ["Big/big.data"]
+    head = storage.client.head_object(Bucket="uci", Key="mirror/Big/big.data")
+    # Three parts: 5 MB, 5 MB and the rest
+    assert head["ETag"].strip('"').endswith("-3")
+    assert storage.open_read("Big/big.data").read() == data
+
+
+def test_small_file_round_trip(storage):
+    with storage.open_write("Small/small.data") as f:
+        f.write(b"1,2,3\n")
+
+    assert storage.open_read("Small/small.data").read() == b"1,2,3\n"
+
+
+def test_multipart_upload_aborted_on_error(storage):
+    with pytest.raises(RuntimeError):
+        with storage.open_write("Big/broken.data") as f:
+            f.write(os.urandom(6 * MB))
+            assert f.upload_id != None
+            raise RuntimeError("download failed")
+
+    assert not storage.exists("Big/broken.data")
+    uploads = storage.client.list_multipart_uploads(Bucket="uci")
+    assert uploads.get("Uploads", []) == []
+
+
+def test_download_and_extract_into_bucket(storage, http_server, tmp_path, monkeypatch):
+    base_url, root, counts = http_server
+    monkeypatch.chdir(tmp_path)
+    directory = root / "arc"
+    directory.mkdir()
+    with zipfile.ZipFile(directory / "z.zip", "w") as z:
+        z.writestr("z1.data", b"zip member 1\n")
+        z.writestr("sub/z2.data", b"zip member 2\n")
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as t:
+        member = tarfile.TarInfo("t1.data")
+        member.size = len(b"tar member\n")
+        t.addfile(member, io.BytesIO(b"tar member\n"))
+    (directory / "t.tar.gz").write_bytes(buffer.getvalue())
+    (directory / "small.bin.Z").write_bytes(Z_FILE)
+
+    failed = uci.download_dataset_url(
+        f"{base_url}/arc/", "Archives", extract=True, storage=storage
+    )
+
+    assert failed == []
+    keys = storage.list_keys("Archives")
+    for key in ["z.zip", "t.tar.gz", "small.bin.Z"]:
+        assert "Archives/" + key in keys
+    contents = {
+        "z1.data": b"zip member 1\n",
+        "sub/z2.data": b"zip member 2\n",
+        "t1.data": b"tar member\n",
+        "small.bin": Z_CONTENTS,
+    }
+    for key, data in contents.items():
+        assert storage.open_read("Archives/" + key).read() == data
+    assert "Archives/" + uci.EXTRACTION_MANIFEST in keys
+    # Nothing was staged on the local disk
+    assert not os.path.exists("Archives")
@@ -0,0 +1,78 @@
+import multiprocessing
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import UCI_ML_Functions as uci
+
+N_DATASETS = 8
+N_WORKERS = 3
+LEASE_SECONDS = 2
+
+
+def lease_and_die(queue_file):
+    # A worker which leases a dataset and stops without releasing it
+    uci.lease_dataset(queue_file, "dead-worker", lease_seconds=LEASE_SECONDS)
+    os._exit(1)
+
+
+def test_workers_download_all_and_release_expired_leases(
+    http_server, tmp_path, monkeypatch
+):
+    base_url, root, counts = http_server
+    names = [f"Dataset {i}" for i in range(N_DATASETS)]
+    for i, name in enumerate(names):
+        (root / f"d{i}").mkdir()
+        (root / f"d{i}" / f"d{i}.data").write_bytes(name.encode() * 1000)
+    database = tmp_path / "UCI database.csv"
+    pd.DataFrame(
+        {
+            "Dataset": names,
+            "Name": names,
+            "Datapage URL": [f"{base_url}/d{i}/" for i in range(N_DATASETS)],
+        }
+    ).to_csv(database, index=False)
+    mirror = tmp_path / "mirror"
+    mirror.mkdir()
+    monkeypatch.chdir(mirror)
+    queue_file = str(tmp_path / "queue.db")
+
+    assert uci.init_work_queue(queue_file, str(database), msg_flag=False) == N_DATASETS
+    assert uci.init_work_queue(queue_file, str(database), msg_flag=False) == 0
+
+    context = multiprocessing.get_context("spawn")
+    dead = context.Process(target=lease_and_die, args=(queue_file,))
+    dead.start()
+    dead.join()
+    assert uci.work_queue_progress(queue_file, msg_flag=False)["workers"] == {
+        "dead-worker": 1
+    }
+
+    with ProcessPoolExecutor(N_WORKERS, mp_context=context) as executor:
+        futures = [
+            executor.submit(
+                uci.run_download_worker,
+                queue_file,
+                worker_id=f"worker-{i}",
+                lease_seconds=LEASE_SECONDS,
+                msg_flag=False,
+            )
+            for i in range(N_WORKERS)
+        ]
+        processed = [future.result() for future in futures]
+
+    assert sum(processed) == N_DATASETS
+    progress = uci.work_queue_progress(queue_file, msg_flag=False)
+    assert progress["done"] == N_DATASETS
+    assert progress["leased"] == progress["pending"] == progress["failed"] == 0
+
+    with sqlite3.connect(queue_file) as con:
+        attempts = dict(con.execute("SELECT name, attempts FROM datasets"))
+    # The dataset of the dead worker was leased again once its lease expired
+    assert attempts == {name: 2 if name == names[0] else 1 for name in names}
+    for i, name in enumerate(names):
+        with open(mirror / name / f"d{i}.data", "rb") as f:
+            assert f.read() == name.encode() * 1000
+        assert counts[f"/d{i}/d{i}.data"] == 1